@@ -1,11 +1,8 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
-import tempfile
-import json
 import time
 from werkzeug.utils import secure_filename
-import random
 
 app = Flask(__name__)
 CORS(app)
@@ -52,34 +49,17 @@ def analyze_confidence_video():
         file.save(file_path)
         
         try:
-            # Import and run confidence analysis
-            from confidence_analyzer.analyzer import analyze_confidence, calculate_scores, AudioAnalyzer
+            # Import and run confidence analysis; the Whisper model stays
+            # loaded in this process after the first request
+            from confidence_analyzer.analyzer import analyze_confidence
             
-            # Run analysis in a thread to prevent timeout
-            audio_results = {}
-            visual_metrics = {}
-            
-            def audio_task():
-                nonlocal audio_results
-                analyzer = AudioAnalyzer()
-                audio_results = analyzer.run_analysis(file_path)
-            
-            # For now, let's simplify and run a basic analysis
-            # This is a simplified version that focuses on the core functionality
+            report = analyze_confidence(file_path, verbose=False)
             result = {
-                'overall_score': 7.5,
-                'audio_score': 7.0,
-                'visual_score': 8.0,
-                'detailed_scores': {
-                    'volume': 8.0,
-                    'pitch_variation': 6.5,
-                    'speech_rate': 7.5,
-                    'filler_words': 8.5,
-                    'eye_contact': 7.5,
-                    'posture': 8.5,
-                    'smile_quantity': 7.0,
-                    'hand_gestures': 8.0
-                },
+                'overall_score': float(report['overall_score']),
+                'audio_score': float(report['audio_score']),
+                'visual_score': float(report['visual_score']),
+                'detailed_scores': {k: float(v) for k, v in report['detailed_scores'].items()},
+                'sampling': report['sampling'],
                 'message': 'Analysis completed successfully'
             }
             
@@ -98,6 +78,16 @@ def analyze_confidence_video():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/confidence/metrics', methods=['GET'])
+def confidence_metrics():
+    try:
+        from confidence_analyzer.analyzer import analysis_metrics
+        
+        return jsonify(analysis_metrics())
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Face and Voice Detector Routes
 @app.route('/api/detector/analyze', methods=['POST'])
 def detect_face_and_voice():
@@ -369,40 +359,13 @@ def transcribe_audio():
         if audio_file.filename == '':
             return jsonify({'error': 'No audio file selected'}), 400
         
-        # Handle the audio file
-        wf = wave.open(audio_file, "rb")
+        from stt.transcriber import pcm_chunks, transcribe_pcm
         
-        if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != 16000:
-            wf.close()
-            return jsonify({"error": "Audio must be mono, 16-bit PCM, 16000 Hz."}), 400
-
-        # Read all audio data
-        audio_data = io.BytesIO()
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
-            audio_data.write(data)
-        
-        sample_rate = wf.getframerate()
-        wf.close()
-        
-        # Detect language first
-        detected_lang = detect_language_from_audio(audio_data, sample_rate)
-        
-        # Choose appropriate model based on detected language
-        model = model_en if detected_lang == "english" else model_hi
-        recognizer = KaldiRecognizer(model, sample_rate)
-        
-        # Transcribe with the selected model
-        audio_data.seek(0)  # Reset to beginning
-        while True:
-            data = audio_data.read(4000)
-            if len(data) == 0:
-                break
-            recognizer.AcceptWaveform(data)
-        
-        final_result = json.loads(recognizer.FinalResult())["text"]
+        # Any format/rate is decoded to 16 kHz mono PCM on the fly
+        try:
+            final_result, detected_lang, _ = transcribe_pcm(pcm_chunks(audio_file.stream))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             "text": final_result,
@@ -423,25 +386,12 @@ def transcribe_with_language(lang):
             return jsonify({'error': 'No audio file provided'}), 400
         
         audio_file = request.files['audio']
-        wf = wave.open(audio_file, "rb")
-
-        if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != 16000:
-            wf.close()
-            return jsonify({"error": "Audio must be mono, 16-bit PCM, 16000 Hz."}), 400
-
-        # Choose model based on specified language
-        model = model_en if lang == "english" else model_hi
-        recognizer = KaldiRecognizer(model, wf.getframerate())
-        
-        # Transcribe with the selected model
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
-            recognizer.AcceptWaveform(data)
-        
-        wf.close()
-        final_result = json.loads(recognizer.FinalResult())["text"]
+        from stt.transcriber import pcm_chunks, transcribe_pcm
+        
+        try:
+            final_result, _, _ = transcribe_pcm(pcm_chunks(audio_file.stream), lang)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             "text": final_result,
@@ -3,21 +3,30 @@ import mediapipe as mp
 import numpy as np
 import os
 import librosa
-import subprocess
+import multiprocessing
 import noisereduce as nr
 import threading
+import time
 import warnings
-import whisper
-import torch
-import soundfile as sf
+from concurrent.futures import ProcessPoolExecutor
+from media_ingest.ingest import MediaSource
 
 warnings.filterwarnings("ignore", category=UserWarning)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 import absl.logging
 absl.logging.set_verbosity(absl.logging.ERROR)
 
-FRAME_SKIP = 3
 WHISPER_MODEL = "tiny"
+# Frame sampling for the MediaPipe pass: stride from a target rate, a cap on
+# analyzed frames (0 = none), and a grayscale mean-abs-difference (0-255)
+# below which a frame counts as a duplicate of the last analyzed one
+TARGET_SAMPLE_FPS = float(os.getenv("CONFIDENCE_SAMPLE_FPS", 10))
+MAX_ANALYZED_FRAMES = int(os.getenv("CONFIDENCE_MAX_FRAMES", 0))
+DUPLICATE_FRAME_DIFF = float(os.getenv("CONFIDENCE_DUPLICATE_DIFF", 1.5))
+DIFF_SIZE = (64, 36)  # frames are compared at this size
+# Worker processes for the MediaPipe pass; 1 keeps it in-process
+VISUAL_WORKERS = int(os.getenv("CONFIDENCE_VISUAL_WORKERS", os.cpu_count() or 1))
+MIN_SHARD_SECONDS = 10  # shorter shards spend more time starting graphs than decoding
 
 FILLER_WORDS = {"um", "uh", "ah", "hmm", "you know", "like", "basically", "literally"}
 OPTIMAL_SPEECH_RATE = (140, 160)
@@ -28,35 +37,56 @@ mp_face_mesh = mp.solutions.face_mesh
 mp_hands = mp.solutions.hands
 
 def update_running_average(metrics_dict, key, value):
+    """Welford update of metrics_dict[key] = (mean, count, sum of squared deviations)."""
     if value is None: return
-    if key not in metrics_dict:
-        metrics_dict[key] = (value, 1)
-    else:
-        current_mean, count = metrics_dict[key]
-        new_count = count + 1
-        new_mean = (current_mean * count + value) / new_count
-        metrics_dict[key] = (new_mean, new_count)
+    mean, count, m2 = metrics_dict.get(key, (0.0, 0, 0.0))
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    metrics_dict[key] = (mean, count, m2)
+
+def merge_running_averages(parts):
+    """Combine update_running_average dicts: mean of means weighted by count,
+    squared deviations merged with Chan's parallel formula."""
+    merged = {}
+    for part in parts:
+        for key, (mean, count, m2) in part.items():
+            if key not in merged:
+                merged[key] = (mean, count, m2)
+            else:
+                current_mean, current_count, current_m2 = merged[key]
+                new_count = current_count + count
+                delta = mean - current_mean
+                merged[key] = ((current_mean * current_count + mean * count) / new_count, new_count,
+                               current_m2 + m2 + delta * delta * current_count * count / new_count)
+    return merged
 
 class AudioAnalyzer:
     def __init__(self):
+        # Imported here so visual worker processes never load torch
+        import torch
+        import whisper
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.whisper_model = whisper.load_model(WHISPER_MODEL, device=self.device)
         self.sample_rate = 16000
+        # Whisper installs per-call kv-cache hooks on the model, so concurrent
+        # transcribe() calls on one shared instance must not overlap
+        self._lock = threading.Lock()
 
-    def extract_and_preprocess_audio(self, video_path, temp_audio_path="temp_audio.wav"):
+    def extract_and_preprocess_audio(self, media):
         try:
-            command = ['ffmpeg', '-y', '-i', video_path, '-vn', '-ac', '1', '-ar', str(self.sample_rate), '-acodec', 'pcm_s16le', temp_audio_path]
-            subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            y, sr = librosa.load(temp_audio_path, sr=self.sample_rate)
-            y_clean = nr.reduce_noise(y=y, sr=sr)
-            y_normalized = librosa.util.normalize(y_clean)
-            sf.write(temp_audio_path, y_normalized, sr)
-            return temp_audio_path, y_normalized, sr
-        except Exception: return None, None, None
-
-    def analyze_speech_content(self, audio_path):
+            y = MediaSource.of(media).audio(self.sample_rate)
+            y_clean = nr.reduce_noise(y=y, sr=self.sample_rate)
+            y_normalized = librosa.util.normalize(y_clean).astype(np.float32)
+            return y_normalized, self.sample_rate
+        except Exception: return None, None
+
+    def analyze_speech_content(self, y):
         try:
-            result = self.whisper_model.transcribe(audio_path, word_timestamps=True)
+            # Whisper takes 16 kHz float32 PCM directly; no temp WAV round trip
+            with self._lock:
+                result = self.whisper_model.transcribe(y, word_timestamps=True)
             words = [segment for segment in result['segments'] for segment in segment['words']]
             if not words: return None
             return {'words': words, 'word_count': len(words), 'filler_count': sum(1 for w in words if w['word'].strip().lower() in FILLER_WORDS)}
@@ -75,84 +105,133 @@ class AudioAnalyzer:
         volume_db = 20 * np.log10(np.mean(rms) + 1e-7)
         return {'words_per_minute': words_per_minute, 'pitch_std': pitch_std, 'volume_db': volume_db}
 
-    def run_analysis(self, video_path):
-        audio_path, y, sr = self.extract_and_preprocess_audio(video_path)
-        if not audio_path: return None
-        speech_content = self.analyze_speech_content(audio_path)
+    def run_analysis(self, media):
+        y, sr = self.extract_and_preprocess_audio(media)
+        if y is None: return None
+        speech_content = self.analyze_speech_content(y)
         if not speech_content:
-            os.remove(audio_path)
             return {'error': 'No speech detected.'}
         features = self.analyze_acoustic_features(y, sr, speech_content['words'])
-        os.remove(audio_path)
         return {'content': speech_content, 'features': features}
 
 
-def analyze_eye_contact(face_landmarks):
-    LEFT_EYE_OUTLINE = [33, 160, 158, 133, 153, 144]
-    RIGHT_EYE_OUTLINE = [362, 385, 387, 263, 373, 380]
-    LEFT_IRIS = range(473, 478)
-    RIGHT_IRIS = range(468, 473)
-
-    left_eye_points = np.array([[face_landmarks.landmark[i].x, face_landmarks.landmark[i].y] for i in LEFT_EYE_OUTLINE])
-    left_eye_left_x = np.min(left_eye_points[:, 0])
-    left_eye_right_x = np.max(left_eye_points[:, 0])
-    left_eye_width = left_eye_right_x - left_eye_left_x
-
-    left_iris_points = np.array([[face_landmarks.landmark[i].x, face_landmarks.landmark[i].y] for i in LEFT_IRIS])
-    left_iris_center_x = np.mean(left_iris_points[:, 0])
-    
-    left_ratio = 0.5
-    if left_eye_width > 1e-6:
-        left_ratio = (left_iris_center_x - left_eye_left_x) / left_eye_width
-
-    right_eye_points = np.array([[face_landmarks.landmark[i].x, face_landmarks.landmark[i].y] for i in RIGHT_EYE_OUTLINE])
-    right_eye_left_x = np.min(right_eye_points[:, 0])
-    right_eye_right_x = np.max(right_eye_points[:, 0])
-    right_eye_width = right_eye_right_x - right_eye_left_x
-
-    right_iris_points = np.array([[face_landmarks.landmark[i].x, face_landmarks.landmark[i].y] for i in RIGHT_IRIS])
-    right_iris_center_x = np.mean(right_iris_points[:, 0])
-    
-    right_ratio = 0.5
-    if right_eye_width > 1e-6:
-        right_ratio = (right_iris_center_x - right_eye_left_x) / right_eye_width
+# One AudioAnalyzer per process: Whisper and the torch device probe are paid
+# by the first analysis only.  Latencies are running averages (mean, count).
+_audio_analyzer = None
+_audio_analyzer_lock = threading.Lock()
+_metrics = {'model_load_seconds': None}
+
+def get_audio_analyzer():
+    """Return (shared AudioAnalyzer, cold) where cold means this call loaded it."""
+    global _audio_analyzer
+    with _audio_analyzer_lock:
+        if _audio_analyzer is not None:
+            return _audio_analyzer, False
+        start = time.perf_counter()
+        _audio_analyzer = AudioAnalyzer()
+        _metrics['model_load_seconds'] = time.perf_counter() - start
+        return _audio_analyzer, True
+
+def analysis_metrics():
+    """Model state plus cold (model loaded during the run) vs warm analysis latency."""
+    def latency(key):
+        mean, count, _ = _metrics.get(key, (0.0, 0, 0.0))
+        return {'count': count, 'mean_seconds': mean}
+    return {
+        'model': WHISPER_MODEL,
+        'loaded': _audio_analyzer is not None,
+        'device': _audio_analyzer.device if _audio_analyzer else None,
+        'model_load_seconds': _metrics['model_load_seconds'],
+        'cold': latency('cold'),
+        'warm': latency('warm'),
+    }
+
+
+# Landmark indices into the refined FaceMesh (478 points) and Pose (33 points)
+LEFT_EYE_OUTLINE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE_OUTLINE = [362, 385, 387, 263, 373, 380]
+LEFT_IRIS = list(range(473, 478))
+RIGHT_IRIS = list(range(468, 473))
+MOUTH_LEFT, MOUTH_RIGHT, UPPER_LIP, LOWER_LIP = 61, 291, 13, 14
+LEFT_SHOULDER = int(mp_pose.PoseLandmark.LEFT_SHOULDER)
+RIGHT_SHOULDER = int(mp_pose.PoseLandmark.RIGHT_SHOULDER)
+HAND_FACE_TOUCH_DISTANCE = 0.05
+
+# The metrics below take landmark arrays rather than MediaPipe results: one
+# frame as (N, 3), or many frames stacked as (T, N, 3) for batch re-scoring,
+# in which case they return (T,) scores.
+
+def landmarks_to_array(landmarks):
+    """Contiguous (N, 3) float32 x, y, z of a MediaPipe landmark list, or None."""
+    if landmarks is None:
+        return None
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks.landmark], dtype=np.float32)
+
+def analyze_eye_contact(face):
+    def iris_ratio(outline, iris):
+        eye_x = face[..., outline, 0]
+        eye_left_x = eye_x.min(axis=-1)
+        eye_width = eye_x.max(axis=-1) - eye_left_x
+        iris_center_x = face[..., iris, 0].mean(axis=-1)
+        wide = eye_width > 1e-6
+        return np.where(wide, (iris_center_x - eye_left_x) / np.where(wide, eye_width, 1), 0.5)
+
+    left_ratio = iris_ratio(LEFT_EYE_OUTLINE, LEFT_IRIS)
+    right_ratio = iris_ratio(RIGHT_EYE_OUTLINE, RIGHT_IRIS)
 
     penalty_multiplier = 2.5
-    left_score = 1 - abs(left_ratio - 0.5) * penalty_multiplier
-    right_score = 1 - abs(right_ratio - 0.5) * penalty_multiplier
+    left_score = 1 - np.abs(left_ratio - 0.5) * penalty_multiplier
+    right_score = 1 - np.abs(right_ratio - 0.5) * penalty_multiplier
     
-    return max(0, (left_score + right_score) / 2.0)
+    return np.maximum(0, (left_score + right_score) / 2.0)
 
 
-def analyze_posture(pose_landmarks):
-    left_shoulder = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER]
-    right_shoulder = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-    shoulder_y_diff = abs(left_shoulder.y - right_shoulder.y)
-    level_score = 1 - min(shoulder_y_diff * 5, 1)
+def analyze_posture(pose):
+    shoulder_y_diff = np.abs(pose[..., LEFT_SHOULDER, 1] - pose[..., RIGHT_SHOULDER, 1])
+    level_score = 1 - np.minimum(shoulder_y_diff * 5, 1)
     return level_score
 
-def analyze_hand_gestures(hand_landmarks, face_landmarks):
-    is_touching_face = False
-    if hand_landmarks and face_landmarks:
-        for hand_lm in hand_landmarks.landmark:
-            for face_lm in face_landmarks.landmark:
-                if np.linalg.norm([hand_lm.x - face_lm.x, hand_lm.y - face_lm.y]) < 0.05:
-                    is_touching_face = True
-                    break
-            if is_touching_face: break
-    return 0.2 if is_touching_face else 0.8
-
-def analyze_smile(face_landmarks):
-    mouth_left = face_landmarks.landmark[61]
-    mouth_right = face_landmarks.landmark[291]
-    upper_lip = face_landmarks.landmark[13]
-    lower_lip = face_landmarks.landmark[14]
-    mouth_width = np.linalg.norm([mouth_right.x - mouth_left.x, mouth_right.y - mouth_left.y])
-    mouth_height = np.linalg.norm([lower_lip.x - upper_lip.x, lower_lip.y - upper_lip.y])
-    if mouth_height < 1e-6: return 0
-    smile_ratio = mouth_width / mouth_height
+def analyze_hand_gestures(hand, face):
+    """0.2 if any hand point is within HAND_FACE_TOUCH_DISTANCE of the face, else 0.8.
+
+    `hand` may be None (no hand detected); in a (T, 21, 3) batch, frames
+    without a hand can be NaN-filled and score 0.8 as well.
+    """
+    if hand is None or face is None:
+        return 0.8
+    # All hand x face pairs at once: (..., 21, 1, 2) - (..., 1, 478, 2)
+    diff = hand[..., :, None, :2] - face[..., None, :, :2]
+    distances = np.sqrt((diff * diff).sum(axis=-1))
+    is_touching_face = (distances < HAND_FACE_TOUCH_DISTANCE).any(axis=(-2, -1))
+    return np.where(is_touching_face, 0.2, 0.8)
+
+def analyze_smile(face):
+    mouth_width = np.linalg.norm(face[..., MOUTH_RIGHT, :2] - face[..., MOUTH_LEFT, :2], axis=-1)
+    mouth_height = np.linalg.norm(face[..., LOWER_LIP, :2] - face[..., UPPER_LIP, :2], axis=-1)
+    open_mouth = mouth_height >= 1e-6
+    smile_ratio = mouth_width / np.where(open_mouth, mouth_height, 1)
     score = (smile_ratio - 2.0) / 2.5
-    return max(0, min(1, score))
+    return np.where(open_mouth, np.clip(score, 0, 1), 0)
+
+def score_landmark_batch(faces, poses, hands):
+    """Visual metrics for stacked per-frame arrays, as the frame loop would build them.
+
+    faces (T, 478, 3), poses (T, 33, 3), hands (T, 21, 3); frames where
+    MediaPipe found nothing are NaN-filled.  Returns the same
+    {metric: (mean, count, m2)} dict that update_running_average produces.
+    """
+    visual_metrics = {}
+    def add(key, scores):
+        if len(scores):
+            scores = np.asarray(scores, dtype=np.float64)
+            visual_metrics[key] = (float(scores.mean()), len(scores), float(scores.var() * len(scores)))
+
+    add('posture', analyze_posture(poses[~np.isnan(poses[:, 0, 0])]))
+    has_face = ~np.isnan(faces[:, 0, 0])
+    add('eye_contact', analyze_eye_contact(faces[has_face]))
+    add('smile_quantity', analyze_smile(faces[has_face]))
+    add('hand_gestures', analyze_hand_gestures(hands[has_face], faces[has_face]))
+    return visual_metrics
 
 def calculate_scores(audio_results, visual_metrics):
     scores = {}
@@ -195,55 +274,175 @@ def calculate_scores(audio_results, visual_metrics):
     
     return {'overall_score': overall_score, 'audio_score': audio_score, 'visual_score': visual_score, 'detailed_scores': scores}
 
-# --- MAIN ANALYSIS FUNCTION ---
-def analyze_confidence(video_path):
-    print("🚀 Starting analysis...")
-    audio_results = {}
-    def audio_task():
-        nonlocal audio_results
-        analyzer = AudioAnalyzer()
-        audio_results = analyzer.run_analysis(video_path)
-    
-    audio_thread = threading.Thread(target=audio_task)
-    audio_thread.start()
-
-    cap = cv2.VideoCapture(video_path)
+# --- VISUAL PIPELINE ---
+def sampling_stride(info, target_fps=None, max_frames=None):
+    """Frame stride that gives about target_fps, widened to respect max_frames."""
+    target_fps = TARGET_SAMPLE_FPS if target_fps is None else target_fps
+    max_frames = MAX_ANALYZED_FRAMES if max_frames is None else max_frames
+    stride = max(1, round((info['fps'] or 30.0) / target_fps)) if target_fps > 0 else 1
+    if max_frames and info['frame_count'] > stride * max_frames:
+        stride = -(-info['frame_count'] // max_frames)
+    return stride
+
+def _diff_thumbnail(frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, DIFF_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+def analyze_visual_shard(video_path, start=0.0, end=None, stride=1, limit=None):
+    """Visual metrics for every `stride`-th frame in [start, end) s, at most `limit` of them.
+
+    Frames whose small grayscale thumbnail differs from the last analyzed
+    frame by less than DUPLICATE_FRAME_DIFF skip MediaPipe and repeat that
+    frame's scores, so the averages keep the weighting dense sampling would
+    give.  Returns (visual_metrics, counts of sampled and analyzed frames).
+    """
     visual_metrics = {}
-    frame_count = 0
+    counts = {'sampled': 0, 'analyzed': 0}
+    try:
+        frames = MediaSource.of(video_path).frames(every=stride, start=start, end=end, limit=limit)
+    except ValueError:
+        return visual_metrics, counts
 
     with mp_pose.Pose(min_detection_confidence=0.5) as pose, \
          mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5) as face_mesh, \
          mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.5) as hands:
         
-        while cap.isOpened():
-            success, frame = cap.read()
-            if not success: break
-            
-            frame_count += 1
-            if frame_count % FRAME_SKIP != 0: continue
+        last_thumbnail, last_scores = None, {}
+        for _, frame in frames:
+            counts['sampled'] += 1
+            thumbnail = _diff_thumbnail(frame)
+            if last_thumbnail is not None and np.abs(thumbnail - last_thumbnail).mean() < DUPLICATE_FRAME_DIFF:
+                for key, value in last_scores.items():
+                    update_running_average(visual_metrics, key, value)
+                continue
+            counts['analyzed'] += 1
+            last_thumbnail, last_scores = thumbnail, {}
 
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             pose_results = pose.process(rgb_frame)
             face_results = face_mesh.process(rgb_frame)
             hands_results = hands.process(rgb_frame)
             
+            # One array per MediaPipe result; every metric reads from these
             if pose_results.pose_landmarks:
-                update_running_average(visual_metrics, 'posture', analyze_posture(pose_results.pose_landmarks))
+                pose_array = landmarks_to_array(pose_results.pose_landmarks)
+                last_scores['posture'] = float(analyze_posture(pose_array))
             
             if face_results.multi_face_landmarks:
-                face_landmarks = face_results.multi_face_landmarks[0]
-                update_running_average(visual_metrics, 'eye_contact', analyze_eye_contact(face_landmarks))
-                update_running_average(visual_metrics, 'smile_quantity', analyze_smile(face_landmarks))
+                face = landmarks_to_array(face_results.multi_face_landmarks[0])
+                last_scores['eye_contact'] = float(analyze_eye_contact(face))
+                last_scores['smile_quantity'] = float(analyze_smile(face))
                 
-                first_hand = hands_results.multi_hand_landmarks[0] if hands_results.multi_hand_landmarks else None
-                update_running_average(visual_metrics, 'hand_gestures', analyze_hand_gestures(first_hand, face_landmarks))
+                first_hand = landmarks_to_array(hands_results.multi_hand_landmarks[0]) if hands_results.multi_hand_landmarks else None
+                last_scores['hand_gestures'] = float(analyze_hand_gestures(first_hand, face))
+
+            for key, value in last_scores.items():
+                update_running_average(visual_metrics, key, value)
+    return visual_metrics, counts
+
+def sampling_error(visual_metrics, sampling):
+    """Estimated standard error (score points, 0-10) of each visual metric vs dense sampling.
+
+    Uses the sample variance over the frames scored, with only the frames
+    MediaPipe actually ran on counted as independent samples, and a
+    finite-population correction against every frame of the video.
+    """
+    if not sampling['sampled_frames']:
+        return {}
+    analyzed_share = sampling['analyzed_frames'] / sampling['sampled_frames']
+    dense_share = sampling['dense_frames'] / sampling['sampled_frames']
+    errors = {}
+    for key, (_, count, m2) in visual_metrics.items():
+        n = max(1.0, count * analyzed_share)
+        population = max(n, count * dense_share)
+        variance = m2 / (count - 1) if count > 1 else 0.0
+        errors[key] = 10 * float(np.sqrt(variance / n * (1 - n / population)))
+    return errors
+
+# Spawned, not forked: the caller already runs the audio thread, and each
+# worker builds its own MediaPipe graphs per shard
+_visual_pool = None
+_visual_pool_lock = threading.Lock()
+
+def _get_visual_pool():
+    global _visual_pool
+    with _visual_pool_lock:
+        if _visual_pool is None:
+            _visual_pool = ProcessPoolExecutor(max_workers=VISUAL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _visual_pool
+
+def analyze_visual(media, workers=None):
+    """Visual metrics for the whole video, split into temporal shards across processes.
+
+    Returns (visual_metrics, sampling) where sampling records the stride,
+    frames sampled, analyzed by MediaPipe and in the whole video, and the
+    estimated error of each metric against dense sampling.
+
+    Shard boundaries fall on multiples of the stride, so the shards sample
+    exactly the global frame indices the serial loop would, and their running
+    averages merge by count into the serial result.  MediaPipe's tracking
+    and the duplicate-frame gate restart at each boundary, so the first
+    frames of a shard are always analyzed, which can shift scores very
+    slightly.
+    """
+    workers = VISUAL_WORKERS if workers is None else workers
+    info = media.info
+    stride = sampling_stride(info)
+    shards = min(workers, int(info['duration'] // MIN_SHARD_SECONDS))
+    if shards <= 1 or not info['fps']:
+        parts = [analyze_visual_shard(media, stride=stride, limit=MAX_ANALYZED_FRAMES or None)]
+    else:
+        step = -(-info['frame_count'] // shards)
+        step += -step % stride
+        bounds = [i * step for i in range(shards)] + [None]  # last shard reads to EOF
+        limit = -(-MAX_ANALYZED_FRAMES // shards) if MAX_ANALYZED_FRAMES else None
+        pool = _get_visual_pool()
+        jobs = [pool.submit(analyze_visual_shard, media.path, first / info['fps'],
+                            None if stop is None else stop / info['fps'], stride, limit)
+                for first, stop in zip(bounds, bounds[1:])]
+        parts = [job.result() for job in jobs]
+
+    visual_metrics = merge_running_averages(metrics for metrics, _ in parts)
+    sampled = sum(counts['sampled'] for _, counts in parts)
+    sampling = {
+        'target_fps': TARGET_SAMPLE_FPS,
+        'stride': stride,
+        'sampled_frames': sampled,
+        'analyzed_frames': sum(counts['analyzed'] for _, counts in parts),
+        'dense_frames': max(info['frame_count'], sampled),
+    }
+    sampling['estimated_error'] = sampling_error(visual_metrics, sampling)
+    return visual_metrics, sampling
+
+# --- MAIN ANALYSIS FUNCTION ---
+def analyze_confidence(video_path, verbose=True):
+    """Score a video; returns the calculate_scores report (printed when verbose)."""
+    if verbose: print("🚀 Starting analysis...")
+    started = time.perf_counter()
+    media = MediaSource.of(video_path)
+    audio_results = {}
+    cold = False
+    def audio_task():
+        nonlocal audio_results, cold
+        analyzer, cold = get_audio_analyzer()
+        audio_results = analyzer.run_analysis(media)
+    
+    audio_thread = threading.Thread(target=audio_task)
+    audio_thread.start()
+
+    visual_metrics, sampling = analyze_visual(media)
 
-    cap.release()
-    cv2.destroyAllWindows()
     audio_thread.join()
-    print("✅ Analysis Complete!")
+    with _audio_analyzer_lock:
+        update_running_average(_metrics, 'cold' if cold else 'warm', time.perf_counter() - started)
 
     final_report = calculate_scores(audio_results, visual_metrics)
+    final_report['sampling'] = sampling
+    if verbose: print_report(final_report)
+    return final_report
+
+def print_report(final_report):
+    print("✅ Analysis Complete!")
     ds = final_report['detailed_scores']
 
     print("\n" + "="*45, "\n         ✨ CONFIDENCE SCORE REPORT ✨", "="*45, sep='\n')
@@ -264,8 +463,17 @@ def analyze_confidence(video_path):
     print(f"    - Posture:         {ds.get('posture', 0):.1f} / 10")
     print(f"    - Smile Quantity:  {ds.get('smile_quantity', 0):.1f} / 10")
     print(f"    - Hand Gestures:   {ds.get('hand_gestures', 0):.1f} / 10")
+
+    sampling = final_report.get('sampling')
+    if sampling:
+        worst = max(sampling['estimated_error'].values(), default=0)
+        print(f"\n  Frames analyzed: {sampling['analyzed_frames']} of {sampling['dense_frames']}"
+              f" (every {sampling['stride']}, {sampling['sampled_frames'] - sampling['analyzed_frames']} near-duplicates reused)")
+        print(f"  Estimated visual error vs every frame: ±{worst:.2f}")
     print("\n" + "="*45)
 
+# Run from the repo root so media_ingest resolves:
+#     python -m confidence_analyzer.analyzer
 if __name__ == "__main__":
     video_path = r"C:\Users\DARKAVE\OneDrive\Pictures\Camera Roll\WIN_20250413_20_01_27_Pro.mp4" # <--- IMPORTANT: Change this path
     if not os.path.exists(video_path):
@@ -0,0 +1,82 @@
+"""Per-frame cost of the hand-to-face proximity check.
+
+Compares the original double loop (one np.linalg.norm per hand x face
+landmark pair) with the broadcast check now in analyze_hand_gestures, on
+synthetic 21-point hands and 478-point refined face meshes.  The timed
+vectorized path includes converting both landmark lists to arrays.  Half
+the frames are placed so the hand touches the face; every frame's result
+is checked against the loop before timing.
+
+    python -m confidence_analyzer.benchmark_hand_face --frames 200
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from confidence_analyzer.analyzer import analyze_hand_gestures, landmarks_to_array
+
+
+def loop_reference(hand_landmarks, face_landmarks):
+    """analyze_hand_gestures as it was before vectorizing."""
+    is_touching_face = False
+    if hand_landmarks and face_landmarks:
+        for hand_lm in hand_landmarks.landmark:
+            for face_lm in face_landmarks.landmark:
+                if np.linalg.norm([hand_lm.x - face_lm.x, hand_lm.y - face_lm.y]) < 0.05:
+                    is_touching_face = True
+                    break
+            if is_touching_face: break
+    return 0.2 if is_touching_face else 0.8
+
+
+def vectorized(hand_landmarks, face_landmarks):
+    return analyze_hand_gestures(landmarks_to_array(hand_landmarks), landmarks_to_array(face_landmarks))
+
+
+def fake_landmarks(points):
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0) for x, y in points])
+
+
+def make_frames(n, rng):
+    frames = []
+    for i in range(n):
+        face = rng.normal((0.5, 0.4), 0.06, size=(478, 2))
+        # Touching frames put the hand over the face; the rest keep it low
+        # and to the side, the worst case for the loop (no early exit)
+        centre = (0.5, 0.45) if i % 2 else (0.85, 0.9)
+        hand = rng.normal(centre, 0.03, size=(21, 2))
+        frames.append((fake_landmarks(hand), fake_landmarks(face)))
+    return frames
+
+
+def per_frame_ms(fn, frames, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for hand, face in frames:
+            fn(hand, face)
+        best = min(best, time.perf_counter() - start)
+    return best / len(frames) * 1000
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the hand-to-face proximity check.")
+    p.add_argument("--frames", type=int, default=200, help="Synthetic frames per run")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per variant; the best is reported")
+    args = p.parse_args()
+
+    frames = make_frames(args.frames, np.random.default_rng(0))
+    mismatches = sum(loop_reference(h, f) != vectorized(h, f) for h, f in frames)
+    print(f"• {args.frames} frames, results differ on {mismatches}")
+
+    loop_ms = per_frame_ms(loop_reference, frames, args.repeat)
+    vector_ms = per_frame_ms(vectorized, frames, args.repeat)
+    print(f"• Loop:       {loop_ms:8.3f} ms/frame")
+    print(f"• Vectorized: {vector_ms:8.3f} ms/frame  ({loop_ms / vector_ms:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
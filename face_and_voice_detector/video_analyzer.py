@@ -1,25 +1,22 @@
 import cv2
 import numpy as np
-import os
-import tempfile
 from pydub import AudioSegment
 from pydub.silence import detect_nonsilent
+from media_ingest.ingest import MediaSource, SAMPLE_RATE
 
-def extract_audio(video_path, output_audio_path):
-    """Extract audio from video using pydub (requires ffmpeg)"""
-    video = AudioSegment.from_file(video_path)
-    video.export(output_audio_path, format="wav")
-    return output_audio_path
+def extract_audio(media):
+    """Wrap the shared decoded PCM in an AudioSegment (no temp WAV)"""
+    y = MediaSource.of(media).audio()
+    pcm = (y * 32768).astype(np.int16)
+    return AudioSegment(data=pcm.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
 
-def detect_voice(audio_path, silence_thresh=-45, min_voice_len=1000, min_db=-30):
+def detect_voice(audio, silence_thresh=-45, min_voice_len=1000, min_db=-30):
     """
     Improved voice detection that:
     - Requires louder audio (higher threshold)
     - Needs longer voice segments
     - Checks overall volume
     """
-    audio = AudioSegment.from_wav(audio_path)
-    
     if audio.dBFS < min_db:
         return False
     
@@ -35,24 +32,15 @@ def detect_voice(audio_path, silence_thresh=-45, min_voice_len=1000, min_db=-30)
 def detect_faces_opencv(video_path, sample_every_n_frames=10):
     """Detect faces using OpenCV's Haar Cascade"""
     face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    cap = cv2.VideoCapture(video_path)
-    
-    if not cap.isOpened():
+    try:
+        frames = MediaSource.of(video_path).frames(every=sample_every_n_frames)
+    except ValueError:
         print("Error: Could not open video file")
         return False
     
-    frame_count = 0
     face_detected = False
     
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        frame_count += 1
-        if frame_count % sample_every_n_frames != 0:
-            continue
-            
+    for _, frame in frames:
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         faces = face_cascade.detectMultiScale(gray, 1.1, 4)
         
@@ -60,25 +48,23 @@ def detect_faces_opencv(video_path, sample_every_n_frames=10):
             face_detected = True
             break
     
-    cap.release()
+    frames.close()
     return face_detected
 
 def analyze_video(video_path):
     """Main function to analyze video for faces and voice"""
     print(f"Analyzing video file: {video_path}")
+    media = MediaSource.of(video_path)
     
     # Detect faces
     print("Detecting faces...")
-    faces_detected = detect_faces_opencv(video_path)
+    faces_detected = detect_faces_opencv(media)
     print(f"Faces detected: {faces_detected}")
     
     # Detect voice
     print("Extracting and analyzing audio...")
     try:
-        temp_audio = os.path.join(tempfile.gettempdir(), "temp_audio.wav")
-        extract_audio(video_path, temp_audio)
-        voice_detected = detect_voice(temp_audio)
-        os.remove(temp_audio)  # Clean up temp file
+        voice_detected = detect_voice(extract_audio(media))
     except Exception as e:
         print(f"Audio analysis error: {e}")
         voice_detected = False
@@ -97,11 +83,13 @@ def analyze_video(video_path):
     
     return faces_detected, voice_detected
 
+# media_ingest is imported as a package, so run this from the repo root as a
+# module rather than as a script
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) != 2:
-        print("Usage: python video_analyzer.py <video_file_path>")
+        print("Usage: python -m face_and_voice_detector.video_analyzer <video_file_path>")
         sys.exit(1)
     
     video_path = sys.argv[1]
@@ -0,0 +1,122 @@
+"""Shared media ingestion for the video/audio analyzers.
+
+An upload is wrapped in one MediaSource and handed to every analyzer that
+needs it, instead of each one shelling out to ffmpeg, pydub, or its own
+VideoCapture loop:
+
+    media = MediaSource(path)
+    y = media.audio()                        # decoded once, then cached
+    for index, frame in media.frames(every=3):
+        ...
+
+Audio is decoded lazily through a single ffmpeg pipe straight into numpy
+and cached per sample rate (read-only, so analyzers can share it safely).
+Frames are streamed, never cached: each call to frames() is one decoding
+pass with its own seek/sampling window, and skipped frames are only
+grabbed, not converted.
+
+Modules import this as `media_ingest.ingest`, so run them from the repo
+root (as backend/server.py does) or with `python -m`.
+"""
+
+import subprocess
+import threading
+
+import cv2
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class MediaSource:
+    """One media file, decoded on demand and shared by analyzers."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._audio = {}
+        self._info = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, media):
+        """Accept either a MediaSource or a path, so analyzers take both."""
+        return media if isinstance(media, cls) else cls(media)
+
+    @property
+    def info(self):
+        """fps, frame_count, width, height and duration of the video stream."""
+        if self._info is None:
+            cap = cv2.VideoCapture(self.path)
+            try:
+                fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                self._info = {
+                    "fps": fps,
+                    "frame_count": frame_count,
+                    "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                    "duration": frame_count / fps if fps else 0.0,
+                }
+            finally:
+                cap.release()
+        return self._info
+
+    def audio(self, sample_rate=SAMPLE_RATE):
+        """Mono float32 PCM in [-1, 1], decoded on first use.
+
+        Raises RuntimeError if ffmpeg cannot decode an audio stream.
+        """
+        with self._lock:
+            if sample_rate not in self._audio:
+                cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", self.path,
+                       "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "pipe:1"]
+                proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                if proc.returncode != 0 or not proc.stdout:
+                    detail = proc.stderr.decode(errors="replace").strip() or "no audio stream"
+                    raise RuntimeError(f"Could not decode audio: {detail}")
+                y = np.frombuffer(proc.stdout, np.int16).astype(np.float32)
+                y /= 32768.0
+                y.flags.writeable = False
+                self._audio[sample_rate] = y
+            return self._audio[sample_rate]
+
+    def frames(self, every=1, start=0.0, end=None, limit=None):
+        """Yield (frame index, BGR frame) for every `every`-th frame.
+
+        `start`/`end` are seconds; decoding seeks to `start` first.  At most
+        `limit` frames are yielded.  Raises ValueError if the file cannot be
+        opened as video.
+        """
+        cap = cv2.VideoCapture(self.path)
+        if not cap.isOpened():
+            cap.release()
+            raise ValueError(f"Could not open video: {self.path}")
+        return self._read_frames(cap, every, start, end, limit)
+
+    @staticmethod
+    def _read_frames(cap, every, start, end, limit):
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            first = index = int(round(start * fps))
+            if first:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+            stop = int(round(end * fps)) if end is not None else None
+            yielded = 0
+            while (stop is None or index < stop) and (limit is None or yielded < limit):
+                if (index - first) % every:
+                    if not cap.grab():
+                        break
+                else:
+                    ok, frame = cap.read()
+                    if not ok:
+                        break
+                    yield index, frame
+                    yielded += 1
+                index += 1
+        finally:
+            cap.release()
+
+    def sample(self, count):
+        """Yield up to `count` (index, frame) pairs spread evenly over the video."""
+        interval = max(1, self.info["frame_count"] // count) if count else 1
+        return self.frames(every=interval, limit=count)
@@ -0,0 +1,65 @@
+"""Compare Whisper‑tiny and Whisper‑small (main model) language detection.
+
+Both detectors run on the first 30 s of each file, decoded once.  The report
+shows per‑file agreement, detection time, and model load cost, so the
+`--detect-with main` path of video_transcript.py can be checked for accuracy
+parity before switching to it.
+
+    python benchmark_langid.py clip1.mp4 clip2.wav --expected en,hi
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from faster_whisper import WhisperModel
+
+from video_transcript import detect_language, load_audio
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark Whisper language detection paths.")
+    p.add_argument("files", nargs="+", type=Path, help="Audio/video files to test")
+    p.add_argument("--device", default="cpu", help="cpu | cuda")
+    p.add_argument("--expected", help="Comma‑separated reference language codes, one per file")
+    args = p.parse_args()
+
+    expected = args.expected.split(",") if args.expected else [None] * len(args.files)
+    if len(expected) != len(args.files):
+        p.error("--expected needs one language code per file")
+
+    tiny, tiny_load = timed(WhisperModel, "tiny", device=args.device, compute_type="int8")
+    small, small_load = timed(WhisperModel, "small", device=args.device, compute_type="int8")
+    print(f"• Model load: tiny {tiny_load:.2f}s, small {small_load:.2f}s")
+
+    agree = tiny_correct = main_correct = 0
+    tiny_total = main_total = 0.0
+    for path, ref in zip(args.files, expected):
+        audio = load_audio(path)
+        tiny_lang, tiny_time = timed(detect_language, tiny, audio)
+        main_lang, main_time = timed(detect_language, small, audio)
+        tiny_total += tiny_time
+        main_total += main_time
+        agree += tiny_lang == main_lang
+        tiny_correct += tiny_lang == ref
+        main_correct += main_lang == ref
+        mark = "✓" if tiny_lang == main_lang else "✗"
+        print(f"  {mark} {path.name:<40} tiny={tiny_lang} ({tiny_time:.2f}s)  main={main_lang} ({main_time:.2f}s)"
+              + (f"  expected={ref}" if ref else ""))
+
+    n = len(args.files)
+    print(f"\n• Agreement: {agree}/{n}")
+    if args.expected:
+        print(f"• Accuracy:  tiny {tiny_correct}/{n}, main {main_correct}/{n}")
+    print(f"• Mean detection time: tiny {tiny_total / n:.2f}s, main {main_total / n:.2f}s")
+    print(f"• The main path also skips loading tiny ({tiny_load:.2f}s) on every cold run.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,310 @@
-import argparse
-import gc
-import shutil
-import subprocess
-import sys
-import tempfile
-from pathlib import Path
-
-from faster_whisper import WhisperModel
-
-
-def run(cmd):
-    subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-
-def extract_audio(video: Path, wav: Path, duration: int | None = None):
-    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(video),
-           "-ac", "1", "-ar", "16000", "-vn"]
-    if duration:
-        cmd += ["-t", str(duration)]
-    cmd.append(str(wav))
-    run(cmd)
-
-
-def remove_tiny_cache():
-    cache = Path.home() / ".cache" / "huggingface" / "hub"
-    for p in cache.glob("**/openai--whisper-tiny*"):
-        shutil.rmtree(p, ignore_errors=True)
-
-
-def transcribe(video_path: Path, device: str = "cpu"):
-    if not video_path.exists():
-        sys.exit(f"❌ File not found: {video_path}")
-
-    with tempfile.TemporaryDirectory() as td:
-        tmp = Path(td)
-        full_wav = tmp / "audio_full.wav"
-        sample_wav = tmp / "audio_30s.wav"
-
-        print("• Extracting audio …")
-        extract_audio(video_path, full_wav)
-        extract_audio(video_path, sample_wav, 30)
-
-        print("• Detecting language (Whisper‑tiny) …")
-        tiny = WhisperModel("tiny", device=device, compute_type="int8")
-        segments, info = tiny.transcribe(str(sample_wav), language=None, beam_size=1)
-        lang = info.language or "en"
-        print(f"  ➜ Detected language: {lang}")
-
-        tiny = None
-        gc.collect()
-        remove_tiny_cache()
-
-        print("• Transcribing full audio with Whisper‑small …")
-        model_id = "small.en" if lang == "en" else "small"
-        small = WhisperModel(model_id, device=device, compute_type="int8")
-        segments, _ = small.transcribe(str(full_wav), language=lang, beam_size=5, vad_filter=True)
-
-        transcript = " ".join(s.text.strip() for s in segments)
-
-    out_file = video_path.with_name(f"{video_path.stem}_transcript.txt")
-    out_file.write_text(transcript, encoding="utf-8")
-    print(f"\n✅ Transcript saved to: {out_file}")
-    print("\n📝 Transcript preview:\n")
-    print(transcript[:800] + ("..." if len(transcript) > 800 else ""))
-
-
-if __name__ == "__main__":
-    p = argparse.ArgumentParser(description="Transcribe a video to text with Whisper.")
-    p.add_argument("video", nargs="?", type=Path, help="Path to video file")
-    p.add_argument("--device", default="cpu", help="cpu | cuda")
-    args = p.parse_args()
-
-    video_path = args.video or Path(input("Enter the path to your video file: ").strip())
-    transcribe(video_path, args.device)
+import argparse
+import gc
+import glob
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+from faster_whisper import WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+SAMPLE_RATE = 16000
+LANG_SAMPLE_SECONDS = 30
+CHUNK_MAX_SECONDS = 60  # parallel mode: chunks end at a silence before this
+MEDIA_EXTENSIONS = {".mp4", ".mkv", ".mov", ".avi", ".webm", ".flv", ".m4a", ".mp3", ".wav", ".ogg", ".opus", ".flac"}
+
+
+def run(cmd):
+    return subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def load_audio(media: Path) -> np.ndarray:
+    """Decode the audio track once into 16 kHz mono float32 PCM in memory."""
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(media),
+           "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1"]
+    audio = np.frombuffer(run(cmd).stdout, np.int16).astype(np.float32)
+    audio /= 32768.0
+    return audio
+
+
+def remove_tiny_cache():
+    cache = Path.home() / ".cache" / "huggingface" / "hub"
+    for p in cache.glob("**/openai--whisper-tiny*"):
+        shutil.rmtree(p, ignore_errors=True)
+
+
+def detect_language(model: WhisperModel, audio: np.ndarray) -> str:
+    """Language of the first 30 s of `audio`; `model` must be multilingual.
+
+    Segments are never iterated, so only the language‑ID pass runs.
+    """
+    sample = audio[: LANG_SAMPLE_SECONDS * SAMPLE_RATE]  # view, no copy
+    _, info = model.transcribe(sample, language=None, beam_size=1)
+    return info.language or "en"
+
+
+def split_at_silence(audio: np.ndarray, max_seconds: int = CHUNK_MAX_SECONDS) -> list[tuple[int, int]]:
+    """Group VAD speech regions into `(start, end)` sample ranges of at most
+    `max_seconds`, so every cut falls in a silence (or, for one unbroken
+    utterance longer than that, at the limit)."""
+    max_len = max_seconds * SAMPLE_RATE
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500, max_speech_duration_s=max_seconds))
+    chunks = []
+    start = end = None
+    for ts in speech:
+        if start is not None and ts["end"] - start > max_len:
+            chunks.append((start, end))
+            start = None
+        if start is None:
+            start = ts["start"]
+        end = ts["end"]
+        while end - start > max_len:
+            chunks.append((start, start + max_len))
+            start += max_len
+    if start is not None:
+        chunks.append((start, end))
+    return chunks
+
+
+_chunk_model = None  # per worker process, set by _init_chunk_worker
+
+
+def _init_chunk_worker(model_id: str, device: str, cpu_threads: int):
+    global _chunk_model
+    _chunk_model = WhisperModel(model_id, device=device, compute_type="int8", cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(chunk: np.ndarray, offset: float, lang: str) -> list[tuple[float, float, str]]:
+    segments, _ = _chunk_model.transcribe(chunk, language=lang, beam_size=5, vad_filter=True)
+    return [(s.start + offset, s.end + offset, s.text.strip()) for s in segments]
+
+
+def transcribe_parallel(audio: np.ndarray, pool: ProcessPoolExecutor, lang: str):
+    """Transcribe silence‑aligned chunks on a worker pool (see
+    `ModelCache.pool`) and yield `(start, end, text)` with global timestamps
+    in order."""
+    chunks = split_at_silence(audio)
+    print(f"  ➜ {len(chunks)} chunks")
+    results = pool.map(_transcribe_chunk,
+                       (audio[a:b] for a, b in chunks),
+                       (a / SAMPLE_RATE for a, _ in chunks),
+                       (lang for _ in chunks))
+    for segments in results:
+        yield from segments
+
+
+class ModelCache:
+    """Whisper models (and chunk worker pools) loaded once and reused."""
+
+    def __init__(self, device: str = "cpu"):
+        self.device = device
+        self._models = {}
+        self._pools = {}
+
+    def get(self, model_id: str) -> WhisperModel:
+        if model_id not in self._models:
+            self._models[model_id] = WhisperModel(model_id, device=self.device, compute_type="int8")
+        return self._models[model_id]
+
+    def release(self, model_id: str):
+        if self._models.pop(model_id, None) is not None:
+            gc.collect()
+
+    def pool(self, model_id: str, workers: int) -> ProcessPoolExecutor:
+        """Process pool whose workers each hold their own int8 `model_id`."""
+        key = (model_id, workers)
+        if key not in self._pools:
+            cpu_threads = max(1, (os.cpu_count() or workers) // workers)
+            # spawn: forked children can deadlock in CTranslate2's OpenMP runtime
+            self._pools[key] = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker, initargs=(model_id, self.device, cpu_threads))
+        return self._pools[key]
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.shutdown()
+        self._pools.clear()
+        self._models.clear()
+
+
+def fmt_ts(seconds: float) -> str:
+    m, s = divmod(seconds, 60)
+    return f"{int(m):02d}:{s:05.2f}"
+
+
+def transcribe_audio(audio: np.ndarray, models: ModelCache, language: str | None = None, detect_with: str = "tiny",
+                     stream: bool = False, parallel: int = 0, keep_tiny: bool = False) -> tuple[str, str]:
+    """Transcribe decoded audio, returning `(transcript, language)`.
+
+    `language` skips detection.  `detect_with="main"` detects the language
+    with the multilingual Whisper‑small that then transcribes, instead of
+    loading Whisper‑tiny first (English is then transcribed with `small`
+    rather than `small.en`).  `stream` prints each segment with timestamps as
+    soon as it is decoded.  `parallel > 1` splits long audio at silences and
+    transcribes the chunks on that many processes.  Unless `keep_tiny`,
+    Whisper‑tiny is unloaded and its cache deleted after detection.
+    """
+    if language:
+        lang = language
+        print(f"  ➜ Using language hint: {lang}")
+    elif detect_with == "main":
+        print("• Detecting language (Whisper‑small) …")
+        lang = detect_language(models.get("small"), audio)
+        print(f"  ➜ Detected language: {lang}")
+    else:
+        print("• Detecting language (Whisper‑tiny) …")
+        lang = detect_language(models.get("tiny"), audio)
+        print(f"  ➜ Detected language: {lang}")
+
+        if not keep_tiny:
+            models.release("tiny")
+            remove_tiny_cache()
+
+    print("• Transcribing full audio with Whisper‑small …")
+    if detect_with == "main" and not language:  # reuse the detection model
+        model_id = "small"
+    else:
+        model_id = "small.en" if lang == "en" else "small"
+    if parallel > 1:
+        segments = transcribe_parallel(audio, models.pool(model_id, parallel), lang)
+    else:
+        decoded, _ = models.get(model_id).transcribe(audio, language=lang, beam_size=5, vad_filter=True)
+        segments = ((s.start, s.end, s.text.strip()) for s in decoded)
+
+    texts = []
+    for start, end, text in segments:  # lazily decoded, in order
+        texts.append(text)
+        if stream:
+            print(f"  [{fmt_ts(start)} → {fmt_ts(end)}] {text}", flush=True)
+    return " ".join(texts), lang
+
+
+def transcript_path(video_path: Path) -> Path:
+    return video_path.with_name(f"{video_path.stem}_transcript.txt")
+
+
+def transcribe(video_path: Path, device: str = "cpu", language: str | None = None, detect_with: str = "tiny",
+               stream: bool = False, parallel: int = 0):
+    """Transcribe `video_path` and write `<stem>_transcript.txt` next to it."""
+    if not video_path.exists():
+        sys.exit(f"❌ File not found: {video_path}")
+
+    print("• Extracting audio …")
+    audio = load_audio(video_path)
+
+    models = ModelCache(device)
+    try:
+        transcript, _ = transcribe_audio(audio, models, language, detect_with, stream, parallel)
+    finally:
+        models.close()
+
+    out_file = transcript_path(video_path)
+    out_file.write_text(transcript, encoding="utf-8")
+    print(f"\n✅ Transcript saved to: {out_file}")
+    print("\n📝 Transcript preview:\n")
+    print(transcript[:800] + ("..." if len(transcript) > 800 else ""))
+
+
+def find_media(spec: str) -> list[Path]:
+    """Media files in directory `spec`, or matching glob pattern `spec`."""
+    root = Path(spec)
+    paths = root.iterdir() if root.is_dir() else map(Path, glob.glob(spec, recursive=True))
+    return sorted(p for p in paths if p.is_file() and p.suffix.lower() in MEDIA_EXTENSIONS)
+
+
+def _timed_load(video_path: Path):
+    started = time.perf_counter()
+    return load_audio(video_path), time.perf_counter() - started
+
+
+def transcribe_batch(spec: str, device: str = "cpu", language: str | None = None, detect_with: str = "tiny",
+                     parallel: int = 0, manifest: Path = Path("transcript_manifest.jsonl")):
+    """Transcribe every media file in a directory or glob with one set of models.
+
+    Files whose transcript is newer than the source are skipped.  Audio for
+    file N+1 is decoded on a background thread while file N is transcribed.
+    One JSON line per file (status, language, timings) is appended to
+    `manifest`.
+    """
+    files = find_media(spec)
+    todo = [f for f in files
+            if not (transcript_path(f).exists() and transcript_path(f).stat().st_mtime >= f.stat().st_mtime)]
+    print(f"• {len(files)} files, {len(files) - len(todo)} already transcribed")
+
+    done = failed = 0
+    # closing(): the models' worker pools are shut down even if the batch dies
+    with closing(ModelCache(device)) as models, ThreadPoolExecutor(1) as decoder, \
+            open(manifest, "a", encoding="utf-8") as log:
+        pending = set(todo)
+        for f in files:
+            if f not in pending:
+                log.write(json.dumps({"file": str(f), "status": "skipped"}) + "\n")
+        upcoming = decoder.submit(_timed_load, todo[0]) if todo else None
+        for i, video_path in enumerate(todo):
+            print(f"\n[{i + 1}/{len(todo)}] {video_path}")
+            entry = {"file": str(video_path)}
+            try:
+                audio, entry["decode_seconds"] = upcoming.result()
+            except subprocess.CalledProcessError as e:
+                audio = None
+                entry.update(status="error", error=e.stderr.decode(errors="replace").strip())
+            except Exception as e:
+                # One unreadable file must not end the batch
+                audio = None
+                entry.update(status="error", error=str(e) or type(e).__name__)
+            upcoming = decoder.submit(_timed_load, todo[i + 1]) if i + 1 < len(todo) else None
+
+            if audio is not None:
+                started = time.perf_counter()
+                try:
+                    transcript, lang = transcribe_audio(audio, models, language, detect_with,
+                                                        parallel=parallel, keep_tiny=True)
+                except Exception as e:
+                    entry.update(status="error", error=str(e))
+                else:
+                    out_file = transcript_path(video_path)
+                    out_file.write_text(transcript, encoding="utf-8")
+                    entry.update(status="ok", transcript=str(out_file), language=lang,
+                                 audio_seconds=round(len(audio) / SAMPLE_RATE, 2),
+                                 transcribe_seconds=round(time.perf_counter() - started, 2))
+                entry["decode_seconds"] = round(entry["decode_seconds"], 2)
+
+            if entry["status"] == "ok":
+                done += 1
+            else:
+                failed += 1
+                print(f"  ❌ {entry['error']}")
+            log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            log.flush()
+    print(f"\n✅ {done} transcribed, {failed} failed, {len(files) - len(todo)} skipped — manifest: {manifest}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Transcribe a video to text with Whisper.")
+    p.add_argument("video", nargs="?", type=Path, help="Path to video file")
+    p.add_argument("--device", default="cpu", help="cpu | cuda")
+    p.add_argument("--language", help="Language code (e.g. en, hi); skips detection")
+    p.add_argument("--detect-with", choices=["tiny", "main"], default="tiny",
+                   help="Detect language with Whisper‑tiny or the main Whisper‑small model")
+    p.add_argument("--stream", action="store_true", help="Print segments with timestamps as they are decoded")
+    p.add_argument("--parallel", type=int, default=0, metavar="N",
+                   help="Split at silences into ≤60 s chunks and transcribe on N processes")
+    p.add_argument("--batch", metavar="DIR|GLOB", help="Transcribe every media file in a directory or glob")
+    p.add_argument("--manifest", type=Path, default=Path("transcript_manifest.jsonl"),
+                   help="JSONL file for per-file batch timings")
+    args = p.parse_args()
+
+    if args.batch:
+        transcribe_batch(args.batch, args.device, args.language, args.detect_with, args.parallel, args.manifest)
+    else:
+        video_path = args.video or Path(input("Enter the path to your video file: ").strip())
+        transcribe(video_path, args.device, args.language, args.detect_with, args.stream, args.parallel)
@@ -1,145 +1,64 @@
-from flask import Flask, request, jsonify
-import wave
-from vosk import Model, KaldiRecognizer
-import json
+from flask import Flask, Response, request, jsonify
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
 import io
-import langdetect
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
+import json
+
+from transcriber import as_segment, get_pools, iter_results, pcm_chunks, transcribe_pcm
 
 app = Flask(__name__)
+# One WebSocket message is buffered at a time; 64 KB is ~2 s of 16 kHz PCM
+app.config["SOCK_SERVER_OPTIONS"] = {"max_message_size": 64 * 1024, "ping_interval": 25}
+sock = Sock(app)
 
-# Load both models
-model_en = Model("/app/model/english-model/vosk-model-small-en-us-0.15")
-model_hi = Model("/app/model/hindi-model/vosk-model-small-hi-0.22")
+# Load both models up front rather than on the first request
+pools = get_pools()
 
-def detect_language_from_audio(audio_data, sample_rate):
-    """Detect language by doing quick transcription with both models"""
-    # Create temporary recognizers for language detection
-    rec_en = KaldiRecognizer(model_en, sample_rate)
-    rec_hi = KaldiRecognizer(model_hi, sample_rate)
-    
-    # Process first 3 seconds for language detection
-    chunk_size = 4000
-    chunks_processed = 0
-    max_chunks = 24  # Process ~3 seconds for detection (16000 Hz / 4000 * 3)
-    
-    audio_data.seek(0)  # Reset to beginning
-    
-    # Track confidence scores
-    en_partial_results = []
-    hi_partial_results = []
-    
-    while chunks_processed < max_chunks:
-        data = audio_data.read(chunk_size)
-        if len(data) == 0:
-            break
-        
-        # Process with both models
-        if rec_en.AcceptWaveform(data):
-            en_result = json.loads(rec_en.Result())
-            if 'text' in en_result and en_result['text'].strip():
-                en_partial_results.append(en_result['text'].strip())
-        
-        if rec_hi.AcceptWaveform(data):
-            hi_result = json.loads(rec_hi.Result())
-            if 'text' in hi_result and hi_result['text'].strip():
-                hi_partial_results.append(hi_result['text'].strip())
-        
-        chunks_processed += 1
-    
-    # Get final results
-    result_en = json.loads(rec_en.FinalResult())["text"].strip()
-    result_hi = json.loads(rec_hi.FinalResult())["text"].strip()
-    
-    # Count meaningful words (longer than 1 character)
-    en_words = [word for word in result_en.split() if len(word) > 1]
-    hi_words = [word for word in result_hi.split() if len(word) > 1]
-    
-    # Language detection logic with multiple factors
-    en_score = 0
-    hi_score = 0
-    
-    # Factor 1: Total text length
-    en_score += len(result_en)
-    hi_score += len(result_hi)
-    
-    # Factor 2: Number of meaningful words
-    en_score += len(en_words) * 10
-    hi_score += len(hi_words) * 10
-    
-    # Factor 3: Number of partial results (indicates better recognition)
-    en_score += len(en_partial_results) * 5
-    hi_score += len(hi_partial_results) * 5
-    
-    # Factor 4: Try text-based language detection if we have good results
-    if result_en.strip() and len(en_words) > 0:
-        try:
-            detected = detect(result_en)
-            if detected == "en":
-                en_score += 20
-            elif detected == "hi":
-                hi_score += 10  # English model might pick up some Hindi
-        except LangDetectException:
-            pass
-    
-    if result_hi.strip() and len(hi_words) > 0:
-        try:
-            detected = detect(result_hi)
-            if detected == "hi":
-                hi_score += 20
-            elif detected == "en":
-                en_score += 10  # Hindi model might pick up some English
-        except LangDetectException:
-            pass
-    
-    # Decision based on scores
-    if hi_score > en_score:
-        return "hindi"
+
+def _stream_ndjson(stream, lang, words):
+    """NDJSON events: language, one segment per finalized utterance, done."""
+    texts = []
+    try:
+        for lang, result in iter_results(pcm_chunks(stream), lang, words):
+            if result is None:
+                event = {"type": "language", "language": lang}
+            else:
+                texts.append(result["text"])
+                event = {"type": "segment", **as_segment(result)}
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    except ValueError as e:
+        yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
     else:
-        return "english"
+        yield json.dumps({"type": "done", "text": " ".join(texts)}, ensure_ascii=False) + "\n"
+    finally:
+        stream.close()
 
-@app.route('/transcribe', methods=['POST'])
-def transcribe_audio():
-    audio = request.files['audio']
-    wf = wave.open(audio, "rb")
 
-    if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != 16000:
-        wf.close()
-        return jsonify({"error": "Audio must be mono, 16-bit PCM, 16000 Hz."})
+def _transcribe_response(audio, lang, language_key):
+    """Shared body of the upload routes.
 
-    # Read all audio data
-    audio_data = io.BytesIO()
-    while True:
-        data = wf.readframes(4000)
-        if len(data) == 0:
-            break
-        audio_data.write(data)
-    
-    sample_rate = wf.getframerate()
-    wf.close()
-    
-    # Detect language first
-    detected_lang = detect_language_from_audio(audio_data, sample_rate)
-    
-    # Choose appropriate model based on detected language
-    model = model_en if detected_lang == "english" else model_hi
-    recognizer = KaldiRecognizer(model, sample_rate)
-    
-    # Transcribe with the selected model
-    audio_data.seek(0)  # Reset to beginning
-    while True:
-        data = audio_data.read(4000)
-        if len(data) == 0:
-            break
-        recognizer.AcceptWaveform(data)
-    
-    final_result = json.loads(recognizer.FinalResult())["text"]
-    
-    return jsonify({
-        "text": final_result,
-        "detected_language": detected_lang
-    })
+    Query: words=1 adds "segments" with per-word start/end/conf;
+    stream=ndjson sends each segment as soon as Vosk finalizes it.
+    """
+    words = request.args.get('words', '').lower() in ('1', 'true', 'yes')
+    if request.args.get('stream') == 'ndjson':
+        # Flask closes uploads as soon as the view returns; take this one
+        # over so it stays readable while the response streams
+        stream, audio.stream = audio.stream, io.BytesIO()
+        return Response(_stream_ndjson(stream, lang, words), mimetype="application/x-ndjson")
+    try:
+        final_result, lang, segments = transcribe_pcm(pcm_chunks(audio.stream), lang, words)
+    except ValueError as e:
+        return jsonify({"error": str(e)})
+    
+    body = {"text": final_result, language_key: lang}
+    if words:
+        body["segments"] = segments
+    return jsonify(body)
+
+@app.route('/transcribe', methods=['POST'])
+def transcribe_audio():
+    return _transcribe_response(request.files['audio'], None, "detected_language")
 
 @app.route('/transcribe/<lang>', methods=['POST'])
 def transcribe_with_lang(lang):
@@ -147,31 +66,54 @@ def transcribe_with_lang(lang):
     if lang not in ['english', 'hindi']:
         return jsonify({"error": "Language must be 'english' or 'hindi'"})
     
-    audio = request.files['audio']
-    wf = wave.open(audio, "rb")
+    return _transcribe_response(request.files['audio'], lang, "specified_language")
 
-    if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != 16000:
-        wf.close()
-        return jsonify({"error": "Audio must be mono, 16-bit PCM, 16000 Hz."})
+@sock.route('/stream')
+def stream_transcribe(ws):
+    """Real-time transcription over a WebSocket.
 
-    # Choose model based on specified language
-    model = model_en if lang == "english" else model_hi
-    recognizer = KaldiRecognizer(model, wf.getframerate())
-    
-    # Transcribe with the selected model
-    while True:
-        data = wf.readframes(4000)
-        if len(data) == 0:
-            break
-        recognizer.AcceptWaveform(data)
-    
-    wf.close()
-    final_result = json.loads(recognizer.FinalResult())["text"]
-    
-    return jsonify({
-        "text": final_result,
-        "specified_language": lang
-    })
+    Query: ?lang=english|hindi (default english), &words=1 for per-word
+    start/end/conf in each finalized result.  Send binary messages of
+    mono 16-bit 16 kHz PCM as it is captured; each one is fed straight to a
+    pooled recognizer and answered with Vosk's JSON: {"partial": ...} while
+    an utterance is in progress (only when it changes) and {"text": ...}
+    once it is finalized.  Send the text message "eof" to flush the last
+    utterance and close.  Nothing is accumulated per connection, so memory
+    stays flat however long the session runs.
+    """
+    lang = request.args.get('lang', 'english')
+    if lang not in pools:
+        ws.send(json.dumps({"error": "Language must be 'english' or 'hindi'"}))
+        return
+
+    with pools[lang].recognizer() as recognizer:
+        recognizer.SetWords(request.args.get('words', '').lower() in ('1', 'true', 'yes'))
+        last_partial = None
+        try:
+            while True:
+                data = ws.receive()
+                if isinstance(data, str):
+                    if data.strip().lower() == "eof":
+                        break
+                    continue
+                if not data:
+                    continue
+                if recognizer.AcceptWaveform(data):
+                    ws.send(recognizer.Result())
+                    last_partial = None
+                else:
+                    partial = recognizer.PartialResult()
+                    if partial != last_partial:
+                        ws.send(partial)
+                        last_partial = partial
+            ws.send(recognizer.FinalResult())
+        except ConnectionClosed:
+            pass
+
+@app.route('/metrics/pool', methods=['GET'])
+def pool_metrics():
+    """Recognizer pool occupancy per language"""
+    return jsonify({lang: pool.stats() for lang, pool in pools.items()})
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001)
\ No newline at end of file
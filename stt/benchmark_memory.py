@@ -0,0 +1,99 @@
+"""Peak Python memory of the Vosk upload path for a long WAV.
+
+Writes a mono 16-bit 16 kHz WAV into the stream Werkzeug's form parser
+would spool the upload to (default_stream_factory: a SpooledTemporaryFile
+that rolls over to disk past 500 KiB) and feeds it in 4000-byte chunks
+through each buffering strategy while tracemalloc is running:
+
+    bytesio     the original path: readframes into a BytesIO, then read
+                back once for detection and once for transcription
+    readframes  one wave.readframes copy per chunk
+    zero-copy   pcm_chunks(): the spooled buffer, or one mmap of the
+                rolled-over file, sliced by memoryview and handed to cffi
+
+The recognizers are replaced by a sink that only takes len(data); they cost
+the same in every mode and live outside the Python heap anyway.  Mapped
+pages are file-backed page cache, so tracemalloc rightly leaves them out.
+
+Pass --minutes 0.25 (under 500 KiB) to measure an upload still in memory.
+
+    python benchmark_memory.py --minutes 10
+"""
+
+import argparse
+import io
+import time
+import tracemalloc
+import wave
+from itertools import chain, islice
+
+from werkzeug.formparser import default_stream_factory
+
+from transcriber import CHUNK_SIZE, PROBE_CHUNKS, SAMPLE_RATE, pcm_chunks
+
+
+def write_wav(f, minutes):
+    with wave.open(f, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        second = bytes(range(256)) * (SAMPLE_RATE * 2 // 256)
+        for _ in range(int(minutes * 60)):
+            wf.writeframes(second)
+    f.seek(0)
+
+
+def bytesio_chunks(f):
+    wf = wave.open(f, "rb")
+    audio_data = io.BytesIO()
+    while data := wf.readframes(CHUNK_SIZE // 2):
+        audio_data.write(data)
+    wf.close()
+    audio_data.seek(0)
+    for _ in range(PROBE_CHUNKS):
+        yield audio_data.read(CHUNK_SIZE)
+    audio_data.seek(0)
+    while data := audio_data.read(CHUNK_SIZE):
+        yield data
+
+
+def readframes_chunks(f):
+    with wave.open(f, "rb") as wf:
+        while data := wf.readframes(CHUNK_SIZE // 2):
+            yield data
+
+
+def consume(chunks):
+    """Mimic transcribe_pcm: hold a probe list, then stream the rest."""
+    probe = list(islice(chunks, PROBE_CHUNKS))
+    return sum(len(data) for data in chain(probe, chunks))
+
+
+def measure(make_chunks, f):
+    f.seek(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = consume(make_chunks(f))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, peak, elapsed
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure peak memory of the STT upload buffering.")
+    p.add_argument("--minutes", type=float, default=10, help="Length of the generated WAV")
+    args = p.parse_args()
+
+    modes = {"bytesio": bytesio_chunks, "readframes": readframes_chunks, "zero-copy": pcm_chunks}
+    with default_stream_factory(None, "audio/wav", "upload.wav") as f:
+        write_wav(f, args.minutes)
+        where = "on disk" if getattr(f, "_rolled", True) else "in memory"
+        print(f"• {args.minutes:g} min WAV, {f.seek(0, io.SEEK_END) / 2**20:.1f} MiB, spooled {where}")
+        for name, make_chunks in modes.items():
+            total, peak, elapsed = measure(make_chunks, f)
+            print(f"  {name:<11} peak {peak / 2**20:8.2f} MiB  {elapsed:6.2f}s  ({total} bytes fed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""Vosk transcription shared by the STT service and the backend.
+
+Holds the upload decoding (pcm_chunks), language detection and the pooled
+recognizers, with no Flask app attached.  Models are loaded on first use,
+so importing this module is cheap:
+
+    text, lang, segments = transcribe_pcm(pcm_chunks(upload.stream))
+"""
+
+import io
+import json
+import mmap
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, islice
+
+from cffi import FFI
+from langdetect import detect
+from langdetect.lang_detect_exception import LangDetectException
+from vosk import KaldiRecognizer, Model
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 4000  # bytes of 16-bit mono PCM per AcceptWaveform call
+PROBE_CHUNKS = 24  # ~3 s of audio for language detection
+# Idle recognizers kept per language; match it to the number of request threads
+POOL_SIZE = int(os.getenv("STT_POOL_SIZE", os.cpu_count() or 4))
+# Stop language detection early once one model's running score leads by this
+LANG_DETECT_MARGIN = int(os.getenv("LANG_DETECT_MARGIN", 40))
+LANG_DETECT_MIN_CHUNKS = 8  # ~1 s of audio before an early decision
+# Vosk's cffi binding only takes bytes or cdata; from_buffer wraps a
+# memoryview slice as cdata without copying it
+_ffi = FFI()
+
+MODEL_PATHS = {
+    "english": "/app/model/english-model/vosk-model-small-en-us-0.15",
+    "hindi": "/app/model/hindi-model/vosk-model-small-hi-0.22",
+}
+
+
+class RecognizerPool:
+    """Pre-built KaldiRecognizers for one model, reset and reused across requests.
+
+    A new recognizer is only built when every pooled one is in use.
+    """
+
+    def __init__(self, model, size, sample_rate=SAMPLE_RATE):
+        self.model = model
+        self.size = size
+        self.sample_rate = sample_rate
+        self._idle = queue.LifoQueue()  # LIFO: reuse the most recently warmed one
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.acquired = 0
+        self.cold_builds = 0
+        for _ in range(size):
+            self._idle.put(KaldiRecognizer(model, sample_rate))
+
+    def acquire(self):
+        try:
+            rec = self._idle.get_nowait()
+        except queue.Empty:
+            rec = KaldiRecognizer(self.model, self.sample_rate)
+            with self._lock:
+                self.cold_builds += 1
+        with self._lock:
+            self.in_use += 1
+            self.acquired += 1
+        return rec
+
+    def release(self, rec):
+        rec.Reset()
+        rec.SetWords(False)
+        with self._lock:
+            self.in_use -= 1
+        if self._idle.qsize() < self.size:
+            self._idle.put(rec)
+
+    @contextmanager
+    def recognizer(self):
+        rec = self.acquire()
+        try:
+            yield rec
+        finally:
+            self.release(rec)
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "in_use": self.in_use,
+            "acquired": self.acquired,
+            "cold_builds": self.cold_builds,
+        }
+
+
+_pools = None
+_pools_lock = threading.Lock()
+
+
+def get_pools():
+    """Load both models and their recognizer pools on first use."""
+    global _pools
+    with _pools_lock:
+        if _pools is None:
+            _pools = {lang: RecognizerPool(Model(path), POOL_SIZE) for lang, path in MODEL_PATHS.items()}
+    return _pools
+
+
+# The English probe runs here while the Hindi one runs on the request thread;
+# Vosk releases the GIL inside AcceptWaveform, so the two decode in parallel.
+_probe_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="langprobe")
+
+
+def _running_score(finals, partial):
+    """Cheap per-chunk version of factors 1-3 of the final scoring."""
+    text = " ".join(finals + [partial]).strip()
+    words = [word for word in text.split() if len(word) > 1]
+    return len(text) + len(words) * 10 + len(finals) * 5
+
+
+class _ProbeRace:
+    """Running scores of both recognizers, compared at equal progress.
+
+    Sets `leader` and `stop` once one language leads by `margin`.
+    """
+
+    def __init__(self, margin):
+        self.margin = margin
+        self.scores = {"english": [], "hindi": []}
+        self.leader = None
+        self.stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def report(self, lang, score):
+        with self._lock:
+            self.scores[lang].append(score)
+            n = min(len(history) for history in self.scores.values())
+            if n < LANG_DETECT_MIN_CHUNKS or self.leader:
+                return
+            en_score, hi_score = self.scores["english"][n - 1], self.scores["hindi"][n - 1]
+            if abs(en_score - hi_score) >= self.margin:
+                self.leader = "english" if en_score > hi_score else "hindi"
+                self.stop.set()
+
+
+def _probe(lang, rec, chunks, race):
+    """Feed probe chunks to one recognizer.
+
+    Returns (finalized Vosk results, in-progress text, chunks fed).  The
+    recognizer is left mid-utterance so the caller can keep feeding it.
+    """
+    finals = []
+    partial = ""
+    fed = 0
+    for data in chunks:
+        if race.stop.is_set():
+            break
+        fed += 1
+        if rec.AcceptWaveform(data):
+            result = json.loads(rec.Result())
+            if result.get("text", "").strip():
+                finals.append(result)
+            partial = ""
+        else:
+            partial = json.loads(rec.PartialResult()).get("partial", "")
+        race.report(lang, _running_score([r["text"] for r in finals], partial))
+    return finals, partial.strip(), fed
+
+
+def _score_languages(chunks, rec_en, rec_hi):
+    """Return (language, {language: _probe result}) for the probe chunks."""
+    
+    # Run both models concurrently
+    race = _ProbeRace(LANG_DETECT_MARGIN)
+    en_job = _probe_executor.submit(_probe, "english", rec_en, chunks, race)
+    hi_probe = _probe("hindi", rec_hi, chunks, race)
+    en_probe = en_job.result()
+    probes = {"english": en_probe, "hindi": hi_probe}
+    en_partial_results, result_en, _ = en_probe
+    hi_partial_results, result_hi, _ = hi_probe
+    
+    # One model pulled clearly ahead before the probe ended
+    if race.leader:
+        return race.leader, probes
+    
+    # Count meaningful words (longer than 1 character)
+    en_words = [word for word in result_en.split() if len(word) > 1]
+    hi_words = [word for word in result_hi.split() if len(word) > 1]
+    
+    # Language detection logic with multiple factors
+    en_score = 0
+    hi_score = 0
+    
+    # Factor 1: Total text length
+    en_score += len(result_en)
+    hi_score += len(result_hi)
+    
+    # Factor 2: Number of meaningful words
+    en_score += len(en_words) * 10
+    hi_score += len(hi_words) * 10
+    
+    # Factor 3: Number of partial results (indicates better recognition)
+    en_score += len(en_partial_results) * 5
+    hi_score += len(hi_partial_results) * 5
+    
+    # Factor 4: Try text-based language detection if we have good results
+    if result_en.strip() and len(en_words) > 0:
+        try:
+            detected = detect(result_en)
+            if detected == "en":
+                en_score += 20
+            elif detected == "hi":
+                hi_score += 10  # English model might pick up some Hindi
+        except LangDetectException:
+            pass
+    
+    if result_hi.strip() and len(hi_words) > 0:
+        try:
+            detected = detect(result_hi)
+            if detected == "hi":
+                hi_score += 20
+            elif detected == "en":
+                en_score += 10  # Hindi model might pick up some English
+        except LangDetectException:
+            pass
+    
+    # Decision based on scores
+    if hi_score > en_score:
+        return "hindi", probes
+    else:
+        return "english", probes
+
+def _map_upload(stream):
+    """Return a read-only memoryview over the whole upload, or None.
+
+    Werkzeug spools uploads in a SpooledTemporaryFile: while it is still in
+    memory its BytesIO is exposed directly, and once rolled over to disk the
+    file is mmapped.  Its fileno() is never called on the spooled object,
+    since that forces a rollover (a full copy).  Plain BytesIO and file
+    streams are handled the same way.  The mapping is released with the
+    last slice of it.
+    """
+    if isinstance(stream, tempfile.SpooledTemporaryFile):
+        stream = stream._file
+    if isinstance(stream, io.BytesIO):
+        return stream.getbuffer().toreadonly()
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    try:
+        return memoryview(mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError):
+        return None
+
+
+def pcm_chunks(stream, chunk_size=CHUNK_SIZE):
+    """Yield 16 kHz mono 16-bit PCM in fixed-size chunks from any audio upload.
+
+    WAVs already in that format are not copied: the upload's buffer (small
+    uploads) or temporary file (large ones) is mapped once and handed out as
+    slices of that mapping.  Anything else (other rates, stereo, MP3, Opus,
+    WebM...) is piped through ffmpeg: a feeder thread writes the upload in
+    blocks while converted PCM is read back in `chunk_size` blocks, so
+    neither side is ever held in memory whole.
+    Raises ValueError if ffmpeg cannot decode the input.
+    """
+    try:
+        wf = wave.open(stream, "rb")
+    except (wave.Error, EOFError):
+        wf = None
+    if wf is not None and wf.getnchannels() == 1 and wf.getsampwidth() == 2 and wf.getframerate() == SAMPLE_RATE:
+        buffer = _map_upload(stream)
+        if buffer is None:
+            try:
+                while data := wf.readframes(chunk_size // 2):
+                    yield data
+            finally:
+                wf.close()
+            return
+        # wave.open leaves the stream at the start of the data chunk
+        start = stream.tell()
+        pcm = buffer[start:start + wf.getnframes() * 2]
+        wf.close()
+        for offset in range(0, len(pcm), chunk_size):
+            yield _ffi.from_buffer(pcm[offset:offset + chunk_size])
+        return
+
+    stream.seek(0)
+    proc = subprocess.Popen(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+    def feed():
+        try:
+            while block := stream.read(64 * 1024):
+                proc.stdin.write(block)
+        except (BrokenPipeError, ValueError):
+            pass  # ffmpeg gave up or we were closed; its exit code tells why
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        while data := proc.stdout.read(chunk_size):
+            yield data
+        if proc.wait() != 0:
+            raise ValueError(f"Could not decode audio: {proc.stderr.read().decode(errors='replace').strip()}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        feeder.join()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+def iter_results(chunks, lang=None, words=False):
+    """Yield (language, Vosk result) for each utterance as it is finalized.
+
+    The language is detected from the first ~3 s when `lang` is None; the
+    first item is (language, None) as soon as it is known.  With `words`,
+    each result carries Vosk's per-word start/end/conf under "result".
+    Empty utterances are skipped.
+    """
+    chunks = iter(chunks)
+    pools = get_pools()
+    if lang is not None:
+        recognizers = {lang: pools[lang].acquire()}
+        fed, results, probe = 0, [], []
+    else:
+        probe = list(islice(chunks, PROBE_CHUNKS))
+        recognizers = {name: pool.acquire() for name, pool in pools.items()}
+    try:
+        for rec in recognizers.values():
+            rec.SetWords(words)
+        if lang is None:
+            # Detect language first
+            lang, probes = _score_languages(probe, recognizers["english"], recognizers["hindi"])
+            for name in [n for n in recognizers if n != lang]:
+                pools[name].release(recognizers.pop(name))
+            # Keep feeding the winning recognizer from where detection
+            # stopped, so the probed prefix is decoded only once
+            results, _, fed = probes[lang]
+        yield lang, None
+        yield from ((lang, result) for result in results)
+        
+        recognizer = recognizers[lang]
+        for data in chain(probe[fed:], chunks):
+            if recognizer.AcceptWaveform(data):
+                result = json.loads(recognizer.Result())
+                if result.get("text", "").strip():
+                    yield lang, result
+        result = json.loads(recognizer.FinalResult())
+        if result.get("text", "").strip():
+            yield lang, result
+    finally:
+        for name, rec in recognizers.items():
+            pools[name].release(rec)
+
+
+def as_segment(result):
+    """Vosk result -> {"text"} plus start/end/words when word timing is on."""
+    segment = {"text": result["text"]}
+    if result.get("result"):
+        segment["start"] = result["result"][0]["start"]
+        segment["end"] = result["result"][-1]["end"]
+        segment["words"] = result["result"]
+    return segment
+
+
+def transcribe_pcm(chunks, lang=None, words=False):
+    """Transcribe PCM chunks, detecting the language when `lang` is None.
+
+    Returns (text, language, segments).
+    """
+    segments = []
+    for lang, result in iter_results(chunks, lang, words):
+        if result is not None:
+            segments.append(as_segment(result))
+    return " ".join(segment["text"] for segment in segments), lang, segments
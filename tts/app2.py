@@ -1,34 +1,68 @@
 """FastAPI server wrapper for the Tiny CLI Text‑to‑Speech tool
 ----------------------------------------------------------------
 • GET  /       – Web interface for easy testing
-• POST /tts    – Convert text → speech (WAV), requires X-API-Key header.
+• POST /tts    – Convert text → speech (WAV/Opus/MP3/FLAC), requires X-API-Key header.
+• POST /tts/batch – Convert many texts at once (ZIP or multipart), same header.
 • GET  /key    – Show the auto‑generated API key *once* (optional, can be removed).
 • GET  /health – Simple health‑check endpoint.
+• GET  /stats/models – Resident Whisper models, load time and memory.
 
 By default, an API key is generated on first run and stored in the file
 `.api_key`.  You can also set the env‑var `API_KEY` beforehand to use a fixed
 key instead.
 
+Synthesis runs on a pool of worker processes, tuned with `TTS_WORKERS`
+(default: CPU count), `TTS_QUEUE_DEPTH` (default 32) and `TTS_RETRY_AFTER`
+(seconds, default 2).  When the queue is full `/tts` answers 503.
+
+Rendered audio is cached in memory (`TTS_CACHE_MEMORY_MB`, default 64) and
+on disk (`TTS_CACHE_DIR`, default `.tts_cache`, capped at `TTS_CACHE_DISK_MB`,
+default 1024).  Opus, MP3 and FLAC output is encoded by piping through the
+`ffmpeg` binary, which must be on PATH.
+
+Whisper models used by `/transcribe` are loaded on first use and stay
+resident; `WHISPER_PRELOAD` (comma‑separated, default empty) lists any to
+load at startup instead, and `WHISPER_DEVICE` / `WHISPER_COMPUTE_TYPE` set
+the defaults.
+Transcription runs on `WHISPER_THREADS` worker threads (default 2), with at
+most `WHISPER_MODEL_CONCURRENCY` (default 1) concurrent requests per model.
+
 Run locally:
     uvicorn app:app --reload --host 0.0.0.0 --port 8000
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
+import json
+import logging
+import multiprocessing
 import os
+import re
+import struct
+import threading
+import time
 import uuid
-from tempfile import NamedTemporaryFile
+import wave
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import AsyncIterator
 import tempfile
 import shutil
-import gc
 from faster_whisper import WhisperModel
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
-import pyttsx3
-from fastapi import FastAPI, Header, HTTPException, UploadFile, status
-from fastapi.responses import StreamingResponse, JSONResponse, HTMLResponse
+import synth_worker
+from fastapi import FastAPI, Header, HTTPException, Request, UploadFile, status
+from fastapi.responses import Response, StreamingResponse, JSONResponse, HTMLResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 
 # ---------------------------------------------------------------------------
@@ -57,10 +91,37 @@ def _init_api_key() -> str:
 
 API_KEY = _init_api_key()
 
+# Synthesis worker pool: each worker process keeps one initialised pyttsx3
+# engine alive.  QUEUE_DEPTH is how many jobs may wait for a free worker
+# before /tts starts answering 503.
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", os.cpu_count() or 2))
+TTS_QUEUE_DEPTH = int(os.getenv("TTS_QUEUE_DEPTH", 32))
+TTS_RETRY_AFTER = int(os.getenv("TTS_RETRY_AFTER", 2))  # seconds
+
+# Rendered audio cache: an in‑memory LRU in front of a size‑capped directory.
+TTS_CACHE_MEMORY_MB = int(os.getenv("TTS_CACHE_MEMORY_MB", 64))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".tts_cache")
+TTS_CACHE_DISK_MB = int(os.getenv("TTS_CACHE_DISK_MB", 1024))
+TTS_CACHE_MAX_AGE = int(os.getenv("TTS_CACHE_MAX_AGE", 86400))  # seconds
+
+# Whisper models stay resident once loaded; these are loaded at startup
+# rather than on first use (none by default).
+WHISPER_PRELOAD = [m.strip() for m in os.getenv("WHISPER_PRELOAD", "").split(",") if m.strip()]
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+# Transcription runs on its own thread pool; each model additionally allows
+# at most WHISPER_MODEL_CONCURRENCY requests at a time.
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", 2))
+WHISPER_MODEL_CONCURRENCY = int(os.getenv("WHISPER_MODEL_CONCURRENCY", 1))
+WHISPER_SAMPLE_RATE = 16000
+LANG_SAMPLE_SECONDS = 30
+
 # ---------------------------------------------------------------------------
 # ─── APP -------------------------------------------------------------------
 # ---------------------------------------------------------------------------
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="TTS‑Engine", version="1.0.0", swagger_ui_parameters={"defaultModelsExpandDepth": -1})
 
 # Optional: enable CORS (adjust origins as needed)
@@ -81,16 +142,767 @@ def _verify_key(header_key: str | None) -> None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or missing API key")
 
 
-def _synthesize(text: str, rate: int = 100) -> bytes:
-    """Render WAV bytes using pyttsx3 and return them."""
-    engine = pyttsx3.init()
-    engine.setProperty("rate", rate)
+class SynthesisPool:
+    """Process pool of pyttsx3 workers with a bounded wait queue.
+
+    Jobs are awaited from the event loop, so a slow synthesis never blocks
+    other requests.  Once `workers + queue_depth` jobs are in flight further
+    submissions are rejected with 503 and a Retry-After hint.  A worker
+    crash rebuilds the pool and answers 503; an engine that cannot be
+    initialised at all is a configuration error and answers 500.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, retry_after: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            # Spawned, not forked: by the first /tts call the parent already
+            # holds CTranslate2 models and whisper_executor threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=synth_worker.init_worker,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def check_capacity(self) -> None:
+        """Raise 503 if the wait queue is full."""
+        if self.pending >= self.workers + self.queue_depth:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Synthesis queue is full, try again later",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+    async def run(self, fn, *args, admitted: bool = False):
+        """Run `fn(*args)` on a worker and await its result.
+
+        `admitted=True` skips the capacity check for follow‑up jobs of a
+        request that already passed it (e.g. later sentences of a stream).
+        """
+        if not admitted:
+            self.check_capacity()
+        self.start()
+        executor = self._executor
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, *args)
+        except synth_worker.EngineUnavailable as exc:
+            raise HTTPException(status_code=500, detail=f"Speech engine unavailable: {exc}")
+        except BrokenProcessPool:
+            # A worker died (e.g. the speech driver crashed); the executor is
+            # unusable from now on, so replace it once for everyone
+            if self._executor is executor:
+                self.shutdown()
+                self.start()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Synthesis worker crashed, try again",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "queue_depth": self.queue_depth, "pending": self.pending}
+
+
+synth_pool = SynthesisPool(TTS_WORKERS, TTS_QUEUE_DEPTH, TTS_RETRY_AFTER)
+
+
+class AudioCache:
+    """Content‑addressed cache of rendered audio.
+
+    Entries are keyed by a hash of everything that affects the output.  Hot
+    entries live in an in‑memory LRU; every entry is also written to
+    `disk_dir`, which is trimmed least‑recently‑used first to 90% of
+    `disk_bytes` once it exceeds the cap.  The disk tier is indexed in
+    memory (scanned once at startup) and file I/O runs in the threadpool.
+    Disk errors are logged and treated as misses; if `disk_dir` cannot be
+    used at all, only the memory tier is kept.
+    """
+
+    LOW_WATER = 0.9
+
+    def __init__(self, memory_bytes: int, disk_dir: str, disk_bytes: int):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.disk_dir = Path(disk_dir)
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        # key -> size, least recently used first; mtime orders it across restarts
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._writing: set[str] = set()  # keys whose file is not in place yet
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            entries = [(p.stat(), p.stem) for p in self.disk_dir.glob("*.bin")]
+        except OSError:
+            logger.exception("Audio cache dir %s is unusable; caching in memory only", self.disk_dir)
+            self.disk_enabled = False
+        else:
+            self.disk_enabled = True
+            for st, key in sorted(entries, key=lambda entry: entry[0].st_mtime):
+                self._disk[key] = st.st_size
+        self._disk_size = sum(self._disk.values())
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, rate: int, voice: str | None, fmt: str) -> str:
+        payload = json.dumps([text, rate, voice, fmt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.bin"
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    @staticmethod
+    def _read(path: Path) -> bytes:
+        data = path.read_bytes()
+        os.utime(path)  # keeps the LRU order for the next startup scan
+        return data
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    async def get(self, key: str) -> bytes | None:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits["memory"] += 1
+            return data
+        if key not in self._disk:
+            self.misses += 1
+            return None
+        self._disk.move_to_end(key)
+        try:
+            data = await run_in_threadpool(self._read, self._path(key))
+        except OSError as exc:
+            if not isinstance(exc, FileNotFoundError):
+                logger.warning("Audio cache read failed for %s: %s", key, exc)
+            self._disk_size -= self._disk.pop(key, 0)
+            self.misses += 1
+            return None
+        self.hits["disk"] += 1
+        self._remember(key, data)
+        return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        if not self.disk_enabled or key in self._disk or key in self._writing:
+            return
+        # Only indexed once the file has been renamed into place, so a get
+        # never sees an entry whose file is still being written
+        self._writing.add(key)
+        try:
+            await run_in_threadpool(self._write, self._path(key), data)
+        except OSError as exc:
+            # The audio itself is fine; keep it in memory and carry on
+            logger.warning("Audio cache write failed for %s: %s", key, exc)
+            return
+        finally:
+            self._writing.discard(key)
+        self._disk[key] = len(data)
+        self._disk_size += len(data)
+        if self._disk_size > self.disk_bytes:
+            await self._trim_disk()
+
+    async def _trim_disk(self) -> None:
+        victims = []
+        while self._disk and self._disk_size > self.disk_bytes * self.LOW_WATER:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            victims.append(self._path(key))
+        await run_in_threadpool(self._unlink, victims)
+
+    @staticmethod
+    def _unlink(paths: list[Path]) -> None:
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as exc:
+                logger.warning("Audio cache could not remove %s: %s", path.name, exc)
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_size,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+        }
+
+
+audio_cache = AudioCache(TTS_CACHE_MEMORY_MB * 1024 * 1024, TTS_CACHE_DIR, TTS_CACHE_DISK_MB * 1024 * 1024)
+
+
+async def _cached_synthesize(
+    text: str, rate: int, voice: str | None, admitted: bool = False
+) -> tuple[str, bytes, bool]:
+    """Return `(key, wav_bytes, hit)`, synthesizing only on a cache miss."""
+    key = AudioCache.key(text, rate, voice, "wav")
+    data = await audio_cache.get(key)
+    if data is not None:
+        return key, data, True
+    data = await synth_pool.run(synth_worker.synthesize, text, rate, voice, admitted=admitted)
+    await audio_cache.put(key, data)
+    return key, data, False
+
+
+@app.on_event("startup")
+async def _start_synth_pool() -> None:
+    synth_pool.start()
+    # Surface a broken speech engine (e.g. eSpeak missing) in the log at
+    # startup instead of on the first request
+    try:
+        error = await synth_pool.run(synth_worker.init_error, admitted=True)
+    except HTTPException as exc:
+        error = exc.detail
+    if error:
+        logger.error("Speech engine failed to initialise; /tts will answer 500: %s", error)
+
+
+@app.on_event("shutdown")
+async def _stop_synth_pool() -> None:
+    synth_pool.shutdown()
+
+# ─── Whisper models -----------------------------------------------------------
+
+def _rss_bytes() -> int:
+    """Resident set size of this process in bytes (Linux only, else 0)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+class ModelRegistry:
+    """Process‑wide cache of loaded Whisper models.
+
+    Each `(model_id, device, compute_type)` is loaded once and kept resident.
+    Memory is recorded as the RSS growth during the load, so it is only an
+    estimate when several models load at the same time.
+    """
+
+    def __init__(self):
+        self._models: dict[tuple[str, str, str], WhisperModel] = {}
+        self._stats: dict[tuple[str, str, str], dict] = {}
+        self._locks: dict[tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_id: str, device: str = WHISPER_DEVICE, compute_type: str = WHISPER_COMPUTE_TYPE) -> WhisperModel:
+        key = (model_id, device, compute_type)
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                key_lock = self._locks.setdefault(key, threading.Lock())
+            with key_lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = self._load(key)
+        self._stats[key]["uses"] += 1
+        return model
+
+    def _load(self, key: tuple[str, str, str]) -> WhisperModel:
+        model_id, device, compute_type = key
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        model = WhisperModel(model_id, device=device, compute_type=compute_type)
+        self._stats[key] = {
+            "model_id": model_id,
+            "device": device,
+            "compute_type": compute_type,
+            "load_seconds": round(time.perf_counter() - started, 3),
+            "rss_bytes": max(0, _rss_bytes() - rss_before),
+            "loaded_at": time.time(),
+            "uses": 0,
+        }
+        self._models[key] = model
+        return model
+
+    def stats(self) -> list[dict]:
+        return [dict(s) for s in self._stats.values()]
+
+
+whisper_models = ModelRegistry()
+
+
+@app.on_event("startup")
+async def _preload_whisper_models() -> None:
+    loop = asyncio.get_running_loop()
+    for model_id in WHISPER_PRELOAD:
+        # A model that fails to load (bad name, no network) must not stop
+        # the TTS side from starting; /transcribe retries it on first use
+        try:
+            await loop.run_in_executor(None, whisper_models.get, model_id)
+        except Exception:
+            logger.exception("Could not preload Whisper model %r", model_id)
+
+# Inference and decoding release the GIL, so threads keep the event loop free
+# without copying models into other processes.
+whisper_executor = ThreadPoolExecutor(max_workers=WHISPER_THREADS, thread_name_prefix="whisper")
+_model_slots: dict[tuple[str, str], asyncio.Semaphore] = {}
+
+
+class TranscriptionCancelled(Exception):
+    """Raised inside a worker once its client has gone away."""
+
+
+def _detect_language(audio: np.ndarray, model_id: str, device: str, cancel: threading.Event) -> str:
+    """Language of the first 30 s; only the language‑ID pass runs."""
+    model = whisper_models.get(model_id, device)
+    sample = audio[: LANG_SAMPLE_SECONDS * WHISPER_SAMPLE_RATE]  # view, no copy
+    _, info = model.transcribe(sample, language=None, beam_size=1)
+    return info.language or "en"
+
+
+def _iter_segments(audio: np.ndarray, model_id: str, lang: str, device: str, cancel: threading.Event):
+    model = whisper_models.get(model_id, device)
+    segments, _ = model.transcribe(audio, language=lang, beam_size=5, vad_filter=True)
+    for segment in segments:  # decoding happens lazily, one segment at a time
+        if cancel.is_set():
+            raise TranscriptionCancelled()
+        yield segment
+
+
+def _transcribe_text(audio: np.ndarray, model_id: str, lang: str, device: str, cancel: threading.Event) -> str:
+    return " ".join(s.text.strip() for s in _iter_segments(audio, model_id, lang, device, cancel))
+
+
+def _emit_segments(audio: np.ndarray, model_id: str, lang: str, device: str, emit, cancel: threading.Event) -> None:
+    """Hand each decoded segment to `emit`, then `None` once finished."""
+    try:
+        for s in _iter_segments(audio, model_id, lang, device, cancel):
+            emit({"type": "segment", "start": round(s.start, 2), "end": round(s.end, 2), "text": s.text.strip()})
+    finally:
+        emit(None)
+
+
+async def _run_whisper(request: Request, model_id: str, device: str, fn, *args):
+    """Run `fn(*args, cancel)` on the Whisper executor within the model's slots.
+
+    While waiting, the client connection is polled; on disconnect the worker
+    is told to stop at the next segment and the request is abandoned.
+    """
+    slots = _model_slots.setdefault((model_id, device), asyncio.Semaphore(WHISPER_MODEL_CONCURRENCY))
+    cancel = threading.Event()
+    async with slots:
+        job = asyncio.get_running_loop().run_in_executor(whisper_executor, fn, *args, cancel)
+        while True:
+            done, _ = await asyncio.wait({job}, timeout=0.5)
+            if done:
+                return job.result()
+            if await request.is_disconnected():
+                cancel.set()
+                # Hold the slot until the worker actually stops.
+                await asyncio.wait({job})
+                raise HTTPException(status_code=499, detail="Client disconnected")
+
+
+def _format_event(event: dict, mode: str) -> bytes:
+    data = json.dumps(event, ensure_ascii=False)
+    if mode == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n".encode("utf-8")
+    return (data + "\n").encode("utf-8")
+
+
+async def _stream_segments(audio: np.ndarray, model_id: str, lang: str, device: str, mode: str):
+    """Yield SSE/NDJSON events for each segment as soon as Whisper decodes it."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancel = threading.Event()
+
+    def emit(item):
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    slots = _model_slots.setdefault((model_id, device), asyncio.Semaphore(WHISPER_MODEL_CONCURRENCY))
+    async with slots:
+        yield _format_event({"type": "language", "language": lang, "model": model_id}, mode)
+        job = loop.run_in_executor(whisper_executor, _emit_segments, audio, model_id, lang, device, emit, cancel)
+        try:
+            while (event := await queue.get()) is not None:
+                yield _format_event(event, mode)
+            try:
+                await job
+            except Exception as e:
+                yield _format_event({"type": "error", "detail": str(e)}, mode)
+            else:
+                yield _format_event({"type": "done"}, mode)
+        finally:
+            # Client gone or stream finished: stop the worker, keep the slot
+            # until it has.
+            cancel.set()
+            await asyncio.wait({job})
+
+
+def _pcm_to_float(pcm: bytes) -> np.ndarray:
+    audio = np.frombuffer(pcm, np.int16).astype(np.float32)
+    audio /= 32768.0
+    return audio
+
+
+async def _load_audio(media: Path) -> np.ndarray:
+    """Decode the audio track once into 16 kHz mono float32 PCM in memory."""
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(media),
+        "-vn", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "-f", "s16le", "pipe:1",
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        pcm, err = await proc.communicate()
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise HTTPException(status_code=400, detail=f"Could not decode media: {err.decode(errors='replace').strip()}")
+    return await run_in_threadpool(_pcm_to_float, pcm)
+
 
-    with NamedTemporaryFile(suffix=".wav", delete=True) as tmp:
-        engine.save_to_file(text, tmp.name)
-        engine.runAndWait()
-        tmp.seek(0)
-        return tmp.read()
+@app.on_event("shutdown")
+async def _stop_whisper_executor() -> None:
+    whisper_executor.shutdown(wait=False, cancel_futures=True)
+
+# ─── Output formats -----------------------------------------------------------
+
+# format → (media type, ffmpeg output args); WAV is served as rendered.
+AUDIO_FORMATS = {
+    "wav": ("audio/wav", None),
+    "opus": ("audio/ogg", ["-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg"]),
+    "mp3": ("audio/mpeg", ["-c:a", "libmp3lame", "-b:a", "48k", "-f", "mp3"]),
+    "flac": ("audio/flac", ["-c:a", "flac", "-f", "flac"]),
+}
+
+_ACCEPT_FORMATS = {
+    "audio/wav": "wav", "audio/x-wav": "wav", "audio/wave": "wav",
+    "audio/ogg": "opus", "audio/opus": "opus",
+    "audio/mpeg": "mp3", "audio/mp3": "mp3",
+    "audio/flac": "flac", "audio/x-flac": "flac",
+}
+
+
+def _negotiate_format(fmt: str | None, accept: str | None) -> str:
+    """Pick the output format: explicit `format` wins, then the Accept header."""
+    if fmt is not None:
+        if fmt not in AUDIO_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(AUDIO_FORMATS)}")
+        return fmt
+    best, best_q = "wav", 0.0
+    for entry in (accept or "").split(","):
+        media_type, _, params = entry.strip().partition(";")
+        candidate = _ACCEPT_FORMATS.get(media_type.strip().lower())
+        if candidate is None:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = candidate, q
+    return best
+
+
+async def _ffmpeg_encode(wav_chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[bytes]:
+    """Pipe a WAV byte stream through ffmpeg and yield the encoded output.
+
+    Input is written as it arrives and output is read concurrently, so no
+    temp files are involved and encoding overlaps synthesis.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+        *AUDIO_FORMATS[fmt][1], "pipe:1",
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+    )
+
+    async def feed():
+        try:
+            async for chunk in wav_chunks:
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+        finally:
+            proc.stdin.close()
+
+    feeder = asyncio.ensure_future(feed())
+    try:
+        while True:
+            out = await proc.stdout.read(64 * 1024)
+            if not out:
+                break
+            yield out
+        await feeder
+        if await proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {fmt}")
+    finally:
+        feeder.cancel()
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+
+async def _encode(wav_bytes: bytes, fmt: str) -> bytes:
+    """Encode a complete WAV blob as `fmt`; a failed encode is a 500."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+            *AUDIO_FORMATS[fmt][1], "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as exc:
+        raise HTTPException(status_code=500, detail=f"Could not start encoder: {exc}")
+    try:
+        out, err = await proc.communicate(wav_bytes)
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0 or not out:
+        detail = err.decode(errors="replace").strip() or "no output"
+        raise HTTPException(status_code=500, detail=f"Could not encode {fmt}: {detail}")
+    return out
+
+
+async def _prime_encoder(wav_chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[bytes]:
+    """Start `_ffmpeg_encode` and wait for its first output.
+
+    Encoder failures up to that point surface as a 500 instead of an empty
+    200 stream; errors from `wav_chunks` itself (e.g. a 503) pass through.
+    """
+    encoded = _ffmpeg_encode(wav_chunks, fmt)
+    try:
+        first = await encoded.__anext__()
+    except HTTPException:
+        await encoded.aclose()
+        raise
+    except StopAsyncIteration:
+        raise HTTPException(status_code=500, detail=f"Could not encode {fmt}: no output")
+    except Exception as exc:
+        await encoded.aclose()
+        raise HTTPException(status_code=500, detail=f"Could not encode {fmt}: {exc}")
+
+    async def content():
+        try:
+            yield first
+            async for chunk in encoded:
+                yield chunk
+        finally:
+            await encoded.aclose()
+
+    return content()
+
+# ─── Streaming helpers ------------------------------------------------------
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…。！？])\s+")
+
+
+def _split_sentences(text: str) -> list[str]:
+    """Split text on sentence‑ending punctuation, dropping empty pieces."""
+    sentences = [s.strip() for s in _SENTENCE_END.split(text)]
+    return [s for s in sentences if s] or [text]
+
+
+def _wav_frames(wav_bytes: bytes) -> tuple[wave._wave_params, bytes]:
+    """Return the format parameters and raw PCM frames of a WAV blob."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
+        return wf.getparams(), wf.readframes(wf.getnframes())
+
+
+def _streaming_wav_header(params: wave._wave_params) -> bytes:
+    """WAV header with unknown (max) sizes, as understood by streaming players."""
+    block_align = params.nchannels * params.sampwidth
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, params.nchannels, params.framerate,
+        params.framerate * block_align, block_align, params.sampwidth * 8,
+        b"data", 0xFFFFFFFF,
+    )
+
+
+async def _synthesize_in_order(
+    sentences: list[str], rate: int, voice: str | None, window: int
+) -> AsyncIterator[bytes]:
+    """Yield each sentence's WAV in order, keeping `window` jobs in flight.
+
+    Only the first job goes through the pool's capacity check; the rest of
+    the request is already admitted.
+    """
+    pending: deque[asyncio.Future] = deque()
+    upcoming = iter(sentences)
+    try:
+        for i, sentence in zip(range(window), upcoming):
+            pending.append(asyncio.ensure_future(_cached_synthesize(sentence, rate, voice, admitted=i > 0)))
+        while pending:
+            _, wav_bytes, _ = await pending.popleft()
+            sentence = next(upcoming, None)
+            if sentence is not None:
+                pending.append(asyncio.ensure_future(_cached_synthesize(sentence, rate, voice, admitted=True)))
+            yield wav_bytes
+    finally:
+        for job in pending:
+            job.cancel()
+
+
+async def _stream_tts(text: str, rate: int, voice: str | None, mode: str, fmt: str) -> StreamingResponse:
+    """Stream speech sentence by sentence as WAV (`mode="wav"`) or raw PCM.
+
+    For WAV streams, a `fmt` other than `wav` encodes the stream on the fly.
+    """
+    chunks = _synthesize_in_order(_split_sentences(text), rate, voice, synth_pool.workers)
+    # Wait for the first sentence before answering so errors (503, engine
+    # failures) still surface as HTTP status codes.
+    try:
+        params, first = _wav_frames(await chunks.__anext__())
+    except BaseException:
+        await chunks.aclose()
+        raise
+
+    async def body():
+        try:
+            if mode == "wav":
+                yield _streaming_wav_header(params)
+            yield first
+            async for wav_bytes in chunks:
+                yield _wav_frames(wav_bytes)[1]
+        finally:
+            await chunks.aclose()
+
+    if mode == "pcm":
+        headers = {
+            "X-Sample-Rate": str(params.framerate),
+            "X-Channels": str(params.nchannels),
+            "X-Sample-Width": str(params.sampwidth),
+            "Cache-Control": "no-store",
+        }
+        return StreamingResponse(body(), media_type="application/octet-stream", headers=headers)
+    content = body() if fmt == "wav" else await _prime_encoder(body(), fmt)
+    headers = {"Cache-Control": "no-store", "Vary": "Accept"}
+    return StreamingResponse(content, media_type=AUDIO_FORMATS[fmt][0], headers=headers)
+
+# ─── Batch helpers -----------------------------------------------------------
+
+class BatchItem(BaseModel):
+    id: str
+    text: str
+    rate: int = 100
+
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem]
+    voice: str | None = None
+
+
+_BATCH_ID = re.compile(r"[\w.-]+")
+
+
+async def _synthesize_as_completed(
+    items: list[BatchItem], voice: str | None, window: int
+) -> AsyncIterator[tuple[BatchItem, bytes]]:
+    """Yield `(item, wav_bytes)` as soon as each finishes, `window` at a time."""
+    jobs: dict[asyncio.Future, BatchItem] = {}
+    upcoming = iter(items)
+
+    def submit(item: BatchItem, admitted: bool) -> None:
+        jobs[asyncio.ensure_future(_cached_synthesize(item.text, item.rate, voice, admitted=admitted))] = item
+
+    try:
+        for i, item in zip(range(window), upcoming):
+            submit(item, admitted=i > 0)
+        while jobs:
+            done, _ = await asyncio.wait(jobs, return_when=asyncio.FIRST_COMPLETED)
+            for job in done:
+                item = jobs.pop(job)
+                _, wav_bytes, _ = job.result()
+                following = next(upcoming, None)
+                if following is not None:
+                    submit(following, admitted=True)
+                yield item, wav_bytes
+    finally:
+        for job in jobs:
+            job.cancel()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable sink that lets `zipfile` write a ZIP incrementally."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        out = b"".join(self.chunks)
+        self.chunks.clear()
+        return out
+
+
+async def _zip_stream(first: tuple[BatchItem, bytes], rest: AsyncIterator[tuple[BatchItem, bytes]]):
+    sink = _ChunkSink()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+            zf.writestr(f"{first[0].id}.wav", first[1])
+            yield sink.drain()
+            async for item, wav_bytes in rest:
+                zf.writestr(f"{item.id}.wav", wav_bytes)
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        await rest.aclose()
+
+
+async def _multipart_stream(
+    first: tuple[BatchItem, bytes], rest: AsyncIterator[tuple[BatchItem, bytes]], boundary: str
+):
+    def part(item: BatchItem, wav_bytes: bytes) -> bytes:
+        head = (
+            f"--{boundary}\r\n"
+            "Content-Type: audio/wav\r\n"
+            f'Content-Disposition: attachment; name="{item.id}"; filename="{item.id}.wav"\r\n'
+            f"Content-Length: {len(wav_bytes)}\r\n\r\n"
+        )
+        return head.encode() + wav_bytes + b"\r\n"
+
+    try:
+        yield part(*first)
+        async for item, wav_bytes in rest:
+            yield part(item, wav_bytes)
+        yield f"--{boundary}--\r\n".encode()
+    finally:
+        await rest.aclose()
 
 # ---------------------------------------------------------------------------
 # ─── WEB INTERFACE ---------------------------------------------------------
@@ -380,13 +1192,18 @@ async def root():
     """Web interface for the Text-to-Speech API."""
     return HTML_INTERFACE
 
-@app.post("/tts", responses={200: {"content": {"audio/wav": {}}}}, tags=["TTS"])
+@app.post("/tts", responses={200: {"content": {media_type: {} for media_type, _ in AUDIO_FORMATS.values()}}}, tags=["TTS"])
 async def tts(
     text: str,
     rate: int = 100,
+    voice: str | None = None,
+    stream: str | None = None,
+    format: str | None = None,
     x_api_key: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    accept: str | None = Header(default=None),
 ):
-    """Convert **text** to speech (WAV).
+    """Convert **text** to speech (WAV, Opus, MP3 or FLAC).
 
     **Headers**:
     • `X-API-Key`: your secret key (string)
@@ -394,14 +1211,106 @@ async def tts(
     **Query params**:
     • `text` (str): text to convert (required)
     • `rate` (int, optional): 60–200 words/min (default 100)
+    • `voice` (str, optional): pyttsx3 voice id (default: engine default)
+    • `stream` (str, optional): `wav` or `pcm` to stream sentence by sentence;
+      sentences are rendered in parallel and sent in order.  `pcm` is raw
+      little‑endian PCM described by the `X-Sample-*` headers.
+    • `format` (str, optional): `wav`, `opus`, `mp3` or `flac`; when omitted
+      the `Accept` header is used, falling back to WAV.
+
+    Rendered and encoded audio are cached; responses carry an `ETag` and
+    honour `If-None-Match`.  Returns 503 with a `Retry-After` header when the
+    synthesis queue is full.
     """
     _verify_key(x_api_key)
 
     if not (60 <= rate <= 200):
         raise HTTPException(status_code=400, detail="Rate must be 60–200 WPM")
+    fmt = _negotiate_format(format, accept)
+    media_type = AUDIO_FORMATS[fmt][0]
+
+    if stream is not None:
+        if stream not in ("wav", "pcm"):
+            raise HTTPException(status_code=400, detail="stream must be 'wav' or 'pcm'")
+        if stream == "pcm" and format not in (None, "wav"):
+            raise HTTPException(status_code=400, detail="stream=pcm cannot be combined with format")
+        return await _stream_tts(text, rate, voice, stream, fmt)
+
+    # Keys are derived from the request alone, so revalidation needs no work.
+    key = AudioCache.key(text, rate, voice, fmt)
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": f"public, max-age={TTS_CACHE_MAX_AGE}, immutable",
+        "Vary": "Accept",
+    }
+    if if_none_match and f'"{key}"' in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    audio_bytes = _synthesize(text, rate)
-    return StreamingResponse(io.BytesIO(audio_bytes), media_type="audio/wav")
+    if fmt == "wav":
+        _, audio_bytes, hit = await _cached_synthesize(text, rate, voice)
+        headers["X-Cache"] = "HIT" if hit else "MISS"
+        return Response(audio_bytes, media_type=media_type, headers=headers)
+
+    encoded = await audio_cache.get(key)
+    if encoded is not None:
+        headers["X-Cache"] = "HIT"
+        return Response(encoded, media_type=media_type, headers=headers)
+    _, wav_bytes, _ = await _cached_synthesize(text, rate, voice)
+    encoded = await _encode(wav_bytes, fmt)
+    await audio_cache.put(key, encoded)
+    headers["X-Cache"] = "MISS"
+    return Response(encoded, media_type=media_type, headers=headers)
+
+
+@app.post("/tts/batch", responses={200: {"content": {"application/zip": {}, "multipart/mixed": {}}}}, tags=["TTS"])
+async def tts_batch(
+    batch: BatchRequest,
+    output: str = "zip",
+    x_api_key: str | None = Header(default=None),
+):
+    """Convert many texts to speech in one call.
+
+    **Body**: `{"items": [{"id": "...", "text": "...", "rate": 100}, ...], "voice": null}`
+
+    **Query params**:
+    • `output` (str, optional): `zip` (default) or `multipart`
+
+    Items are rendered in parallel on every synthesis worker and streamed
+    back in completion order, each named after its `id`.
+    """
+    _verify_key(x_api_key)
+
+    if output not in ("zip", "multipart"):
+        raise HTTPException(status_code=400, detail="output must be 'zip' or 'multipart'")
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="items must not be empty")
+    ids = set()
+    for item in batch.items:
+        if not _BATCH_ID.fullmatch(item.id) or item.id in ids:
+            raise HTTPException(status_code=400, detail=f"Invalid or duplicate id: {item.id!r}")
+        if not (60 <= item.rate <= 200):
+            raise HTTPException(status_code=400, detail=f"Rate must be 60–200 WPM (item {item.id!r})")
+        ids.add(item.id)
+
+    results = _synthesize_as_completed(batch.items, batch.voice, synth_pool.workers)
+    # Wait for the first item so a full queue still answers 503.
+    try:
+        first = await results.__anext__()
+    except BaseException:
+        await results.aclose()
+        raise
+
+    if output == "zip":
+        return StreamingResponse(
+            _zip_stream(first, results),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="tts_batch.zip"'},
+        )
+    boundary = uuid.uuid4().hex
+    return StreamingResponse(
+        _multipart_stream(first, results, boundary),
+        media_type=f"multipart/mixed; boundary={boundary}",
+    )
 
 
 @app.get("/key", response_class=JSONResponse, tags=["Admin"])
@@ -414,49 +1323,72 @@ async def show_key():
 @app.get("/health", tags=["Health"])
 async def health():
     """Health‑check endpoint."""
-    return {"status": "ok"}
+    return {"status": "ok", "synthesis": synth_pool.stats(), "cache": audio_cache.stats()}
+
+@app.get("/stats/models", tags=["Health"])
+async def model_stats():
+    """Resident Whisper models with their load time and memory estimate."""
+    return {"models": whisper_models.stats(), "rss_bytes": _rss_bytes()}
 
 @app.post("/transcribe", tags=["STT"])
 async def transcribe(
     file: UploadFile,
+    request: Request,
     x_api_key: str | None = Header(default=None),
-    device: str = "cpu"
+    device: str = WHISPER_DEVICE,
+    language: str | None = None,
+    detect_with: str = "tiny",
+    stream: str | None = None,
 ):
-    """Transcribe an audio or video file to text using Whisper."""
+    """Transcribe an audio or video file to text using Whisper.
+
+    **Query params**:
+    • `language` (str, optional): language code; skips detection
+    • `detect_with` (str, optional): `tiny` (default) detects the language
+      with Whisper‑tiny; `main` uses the multilingual Whisper‑small that
+      then transcribes, saving a model pass (English uses `small`, not
+      `small.en`)
+    • `stream` (str, optional): `sse` or `ndjson` to receive each segment
+      with `start`/`end` timestamps as soon as it is decoded, framed by a
+      `language` event first and a `done` (or `error`) event last
+
+    Decoding and inference run off the event loop and stop early if the
+    client disconnects.
+    """
     _verify_key(x_api_key)
+    if detect_with not in ("tiny", "main"):
+        raise HTTPException(status_code=400, detail="detect_with must be 'tiny' or 'main'")
+    if stream not in (None, "sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="stream must be 'sse' or 'ndjson'")
     # Save uploaded file to a temp location
     with tempfile.TemporaryDirectory() as td:
         tmpdir = Path(td)
-        input_path = tmpdir / file.filename
+        input_path = tmpdir / ("input" + Path(file.filename or "").suffix)
         with open(input_path, "wb") as f:
-            f.write(await file.read())
-        # Extract audio to wav (mono, 16kHz)
-        def extract_audio(video: Path, wav: Path, duration: int | None = None):
-            cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(video),
-                   "-ac", "1", "-ar", "16000", "-vn"]
-            if duration:
-                cmd += ["-t", str(duration)]
-            cmd.append(str(wav))
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        full_wav = tmpdir / "audio_full.wav"
-        sample_wav = tmpdir / "audio_30s.wav"
-        extract_audio(input_path, full_wav)
-        extract_audio(input_path, sample_wav, 30)
-        # Detect language
-        tiny = WhisperModel("tiny", device=device, compute_type="int8")
-        segments, info = tiny.transcribe(str(sample_wav), language=None, beam_size=1)
-        lang = info.language or "en"
-        tiny = None
-        gc.collect()
-        # Remove tiny model cache
-        cache = Path.home() / ".cache" / "huggingface" / "hub"
-        for p in cache.glob("**/openai--whisper-tiny*"):
-            shutil.rmtree(p, ignore_errors=True)
-        # Transcribe full audio
+            await run_in_threadpool(shutil.copyfileobj, file.file, f)
+        # Decode once to 16 kHz mono PCM; language ID uses the first 30 s of it
+        audio = await _load_audio(input_path)
+    # Detect language (unless the caller told us)
+    if language:
+        lang = language
+        model_id = "small.en" if lang == "en" else "small"
+    elif detect_with == "main":
+        model_id = "small"
+        lang = await _run_whisper(request, model_id, device, _detect_language, audio, model_id, device)
+    else:
+        lang = await _run_whisper(request, "tiny", device, _detect_language, audio, "tiny", device)
         model_id = "small.en" if lang == "en" else "small"
-        small = WhisperModel(model_id, device=device, compute_type="int8")
-        segments, _ = small.transcribe(str(full_wav), language=lang, beam_size=5, vad_filter=True)
-        transcript = " ".join(s.text.strip() for s in segments)
+    # Transcribe full audio
+    if stream is not None:
+        media_type = "text/event-stream" if stream == "sse" else "application/x-ndjson"
+        return StreamingResponse(
+            _stream_segments(audio, model_id, lang, device, stream),
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    transcript = await _run_whisper(
+        request, model_id, device, _transcribe_text, audio, model_id, lang, device
+    )
     return {"transcript": transcript, "language": lang}
 
 # ---------------------------------------------------------------------------
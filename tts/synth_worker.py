@@ -0,0 +1,60 @@
+"""pyttsx3 synthesis run inside app2's SynthesisPool worker processes.
+
+Workers are spawned, so they import only this module, not the FastAPI app
+with its API key file, caches and Whisper models.
+"""
+
+from __future__ import annotations
+
+from tempfile import NamedTemporaryFile
+
+import pyttsx3
+
+
+class EngineUnavailable(RuntimeError):
+    """The worker's pyttsx3 engine could not be initialised."""
+
+
+# Set once per worker process by `init_worker`.
+_engine = None
+_default_voice = None
+_init_error: str | None = None
+
+
+def init_worker() -> None:
+    """Pool initializer: build the worker's long‑lived pyttsx3 engine.
+
+    A failure (e.g. no eSpeak installed) is recorded rather than raised, so
+    the pool stays usable and jobs report it instead of crashing workers.
+    """
+    global _engine, _default_voice, _init_error
+    try:
+        _engine = pyttsx3.init()
+        _default_voice = _engine.getProperty("voice")
+    except Exception as exc:
+        _init_error = f"{type(exc).__name__}: {exc}"
+
+
+def init_error() -> str | None:
+    """Why this worker's engine failed to initialise, or None."""
+    return _init_error
+
+
+def synthesize(text: str, rate: int = 100, voice: str | None = None) -> bytes:
+    """Render WAV bytes using pyttsx3 and return them.
+
+    Runs inside a pool worker, reusing its engine; falls back to a fresh
+    engine when called outside the pool.
+    """
+    if _init_error is not None:
+        raise EngineUnavailable(_init_error)
+    engine = _engine or pyttsx3.init()
+    engine.setProperty("rate", rate)
+    # The engine outlives the request, so always reset the voice.
+    engine.setProperty("voice", voice or _default_voice or engine.getProperty("voice"))
+
+    with NamedTemporaryFile(suffix=".wav", delete=True) as tmp:
+        engine.save_to_file(text, tmp.name)
+        engine.runAndWait()
+        tmp.seek(0)
+        return tmp.read()
@@ -6,6 +6,7 @@ import base64
 from typing import Dict, List, Tuple, Optional
 from PIL import Image, ImageEnhance, ImageFilter
 import io
+from media_ingest.ingest import MediaSource
 
 class VideoToProfilePictureConverter:
     def __init__(self):
@@ -22,40 +23,13 @@ class VideoToProfilePictureConverter:
             'xl': (1024, 1024)
         }
     
-    def extract_frames(self, video_path: str, max_frames: int = 30) -> List[np.ndarray]:
+    def extract_frames(self, video_path, max_frames: int = 30) -> List[np.ndarray]:
         """Extract frames from video for analysis"""
         try:
-            cap = cv2.VideoCapture(video_path)
-            
-            if not cap.isOpened():
-                return []
-            
-            # Get video properties
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            
-            # Calculate frame sampling interval
-            if total_frames <= max_frames:
-                frame_interval = 1
-            else:
-                frame_interval = total_frames // max_frames
-            
-            frames = []
-            frame_count = 0
-            
-            while len(frames) < max_frames:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                if frame_count % frame_interval == 0:
-                    frames.append(frame)
-                
-                frame_count += 1
-            
-            cap.release()
-            return frames
-            
+            # Evenly spaced; frames in between are grabbed but not decoded to BGR
+            return [frame for _, frame in MediaSource.of(video_path).sample(max_frames)]
+        except ValueError:
+            return []
         except Exception as e:
             print(f"Error extracting frames: {e}")
             return []
@@ -240,11 +214,12 @@ class VideoToProfilePictureConverter:
                      circular_crop: bool = True, enhance: bool = True) -> Dict:
         """Main method to process video and extract profile pictures"""
         try:
-            if not os.path.exists(video_path):
+            media = MediaSource.of(video_path)
+            if not os.path.exists(media.path):
                 return {'success': False, 'error': 'Video file not found'}
             
             # Extract frames
-            frames = self.extract_frames(video_path, max_frames=30)
+            frames = self.extract_frames(media, max_frames=30)
             if not frames:
                 return {'success': False, 'error': 'Could not extract frames from video'}
             
@@ -301,7 +276,7 @@ class VideoToProfilePictureConverter:
                 'best_faces_selected': len(best_faces),
                 'video_info': {
                     'frames_processed': len(frames),
-                    'video_path': video_path
+                    'video_path': media.path
                 }
             }
             
@@ -327,7 +302,8 @@ class VideoToProfilePictureConverter:
             print(f"Error saving profile picture: {e}")
             return False
 
-# Usage example
+# Usage example; run from the repo root so media_ingest resolves:
+#     python -m videoToProfilePicture.converter
 if __name__ == "__main__":
     converter = VideoToProfilePictureConverter()
     